@@ -1,27 +1,359 @@
-import google.generativeai as genai     # for API calls
 import os       # for checking if file exists
+import sys      # for command line flags
+import re       # for normalizing questions
+import time     # for cache expiry
+import hashlib  # for cache keys
+import sqlite3  # for the on-disk answer cache
+import json     # for batch output
+import argparse # for batch mode options
+from datetime import datetime  # for history time ranges
+from collections import OrderedDict  # for the in-memory LRU
 
-# Set your API key for Google Generative AI
-genai.configure(api_key="Your API Here")  # Enter your API key here
+API_KEY = "Your API Here"  # Enter your API key here
+_genai = None
+_asyncio = None
+
+# Function to import and configure Google Generative AI on first use (the import is slow)
+def get_genai():
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai     # for API calls
+        # Set your API key for Google Generative AI
+        genai.configure(api_key=API_KEY)
+        _genai = genai
+    return _genai
+
+# Function to import asyncio on first use (only batch mode needs it, and it is slow to import)
+def get_asyncio():
+    global _asyncio
+    if _asyncio is None:
+        import asyncio
+        _asyncio = asyncio
+    return _asyncio
+
+# Conversation with one model, created once and reused for every question
+class QnASession:
+    def __init__(self, model_name="gemini-pro", history_window=10):
+        self.model_name = model_name
+        self.model = get_genai().GenerativeModel(model_name)  # specifies AI model
+        self.chat = self.model.start_chat()
+        # number of previous question/answer pairs sent along with each question
+        self.history_window = history_window
+
+    def ask(self, question, on_chunk=None):
+        # keep only the most recent exchanges so long sessions don't resend everything
+        if self.history_window is not None and len(self.chat.history) > 2 * self.history_window:
+            self.chat.history = self.chat.history[-2 * self.history_window:]
+        if on_chunk is None:
+            return self.chat.send_message(question).text
+        # stream the answer so the first words show up right away
+        parts = []
+        for chunk in self.chat.send_message(question, stream=True):
+            parts.append(chunk.text)
+            on_chunk(chunk.text)
+        return "".join(parts)
+
+    def remember(self, question, answer):
+        # add an exchange answered elsewhere (e.g. from the cache) so follow-up questions keep their context
+        self.chat.history = list(self.chat.history) + [
+            {"role": "user", "parts": [question]},
+            {"role": "model", "parts": [answer]},
+        ]
+
+# Answer cache: small in-memory LRU in front of an SQLite store, with expiry and size limits
+class AnswerCache:
+    def __init__(self, db_path="answer_cache.db", memory_size=256, max_entries=10000, ttl=7 * 24 * 3600):
+        self.memory = OrderedDict()
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(db_path)
+        # WAL with relaxed syncing keeps per-answer commits cheap in batch mode
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(question, model_name):
+        # same question with different case, spacing or trailing punctuation hits the same entry
+        normalized = re.sub(r"\s+", " ", question.strip().lower()).rstrip("?!. ")
+        return hashlib.sha256(f"{model_name}\0{normalized}".encode()).hexdigest()
+
+    def get(self, question, model_name):
+        key = self.make_key(question, model_name)
+        now = time.time()
+        entry = self.memory.get(key)
+        if entry is None:
+            entry = self.conn.execute("SELECT answer, created_at FROM answers WHERE key = ?", (key,)).fetchone()
+        if entry is None or now - entry[1] > self.ttl:
+            self.misses += 1
+            return None
+        # refresh last_used on memory hits too, or the on-disk LRU would evict the hottest answers first
+        self.conn.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        self._remember(key, entry)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, question, model_name, answer):
+        key = self.make_key(question, model_name)
+        now = time.time()
+        self._remember(key, (answer, now))
+        self.conn.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)", (key, answer, now, now))
+        # drop expired answers, then the least recently used ones beyond the size limit
+        self.conn.execute("DELETE FROM answers WHERE created_at < ?", (now - self.ttl,))
+        self.conn.execute("""
+            DELETE FROM answers WHERE key IN (
+                SELECT key FROM answers ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+        self.conn.commit()
+
+    def _remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
 
 # Function to interact with Google Generative AI
-def ask_question(question):
+def ask_question(question, session=None, on_chunk=None, cache=None):
     try:
-        model = genai.GenerativeModel("gemini-pro")  # specifies AI model
-        chat = model.start_chat()
-        response = chat.send_message(question)
+        if session is None:
+            session = QnASession()
+        model_name = session.model_name
+        # only questions asked without earlier context mean the same thing every time;
+        # a follow-up like "what about its capital?" depends on this conversation
+        cacheable = cache is not None and not session.chat.history
+        if cacheable:
+            cached = cache.get(question, model_name)
+            if cached is not None:
+                session.remember(question, cached)
+                return cached
         # extract generated response
-        return response.text
+        answer = session.ask(question, on_chunk)
+        if cacheable:
+            cache.set(question, model_name, answer)
+        return answer
     except KeyError:
         return "Error: Unable to parse response from the API."
     except Exception as e:
         return f"An unexpected error occurred: {e}"
 
+# Batch backends: anything with a model_name and an async answer(question) method works
+class GeminiBackend:
+    def __init__(self, model_name="gemini-pro"):
+        self.model_name = model_name
+        self.model = get_genai().GenerativeModel(model_name)
+
+    async def answer(self, question):
+        response = await self.model.generate_content_async(question)
+        return response.text
+
+# Offline stand-in for tests and throughput benchmarks
+class FakeBackend:
+    model_name = "fake"
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+
+    async def answer(self, question):
+        await get_asyncio().sleep(self.delay)
+        return f"Echo: {question}"
+
+# Function to answer many questions concurrently, writing results in input order
+async def run_batch(questions, backend, output, concurrency=8, cache=None, save_history=True):
+    asyncio = get_asyncio()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def answer_one(question):
+        if cache is not None:
+            cached = cache.get(question, backend.model_name)
+            if cached is not None:
+                return cached, None
+        async with semaphore:
+            try:
+                answer = await backend.answer(question)
+            except Exception as e:
+                return None, str(e)
+        if cache is not None:
+            cache.set(question, backend.model_name, answer)
+        return answer, None
+
+    tasks = [asyncio.create_task(answer_one(question)) for question in questions]
+    answered = 0
+    failed = 0
+    # awaiting in order keeps the output order while later questions keep running
+    for question, task in zip(questions, tasks):
+        answer, error = await task
+        record = {"question": question, "answer": answer}
+        if error is not None:
+            record["error"] = error
+            failed += 1
+        else:
+            answered += 1
+            if save_history:
+                save_conversation(question, answer)
+        output.write(json.dumps(record) + "\n")
+    return answered, failed
+
+# Function to run batch mode from a questions file ("-" for stdin), one question per line
+def batch_main(input_file, output_file=None, concurrency=8, use_cache=True, fake=False):
+    if input_file == "-":
+        questions = [line.strip() for line in sys.stdin if line.strip()]
+    else:
+        with open(input_file, "r", encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+
+    backend = FakeBackend() if fake else GeminiBackend()
+    cache = AnswerCache() if use_cache else None
+    output = open(output_file, "w", encoding="utf-8") if output_file else sys.stdout
+    try:
+        start = time.perf_counter()
+        answered, failed = get_asyncio().run(run_batch(questions, backend, output, concurrency, cache))
+        elapsed = time.perf_counter() - start
+    finally:
+        if output_file:
+            output.close()
+    rate = len(questions) / elapsed if elapsed > 0 else 0.0
+    print(f"Answered {answered} questions ({failed} failed) in {elapsed:.2f}s ({rate:.1f} questions/sec)", file=sys.stderr)
+
+HISTORY_FILE = "conversation_history.db"
+LEGACY_HISTORY_FILE = "conversation_history.txt"
+
+# Conversation history: append-only SQLite table with a time index and full-text search
+class HistoryStore:
+    def __init__(self, db_path=HISTORY_FILE):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                id INTEGER PRIMARY KEY,
+                asked_at REAL NOT NULL,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_conversations_time ON conversations (asked_at)")
+        # full-text index kept in sync by a trigger; fall back to LIKE if FTS5 isn't compiled in
+        try:
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts
+                USING fts5(question, answer, content='conversations', content_rowid='id')
+            """)
+            self.conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+                    INSERT INTO conversations_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+                END
+            """)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+        self.conn.commit()
+
+    def add(self, question, answer, asked_at=None):
+        self.add_many([(asked_at or time.time(), question, answer)])
+
+    def add_many(self, rows):
+        with self.conn:
+            self.conn.executemany("INSERT INTO conversations (asked_at, question, answer) VALUES (?, ?, ?)", rows)
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+
+    def page(self, before_id=None, size=10):
+        # keyset pagination: each page costs the same no matter how old it is
+        if before_id is None:
+            before_id = sys.maxsize
+        return self.conn.execute("""
+            SELECT id, asked_at, question, answer FROM conversations
+            WHERE id < ? ORDER BY id DESC LIMIT ?
+        """, (before_id, size)).fetchall()
+
+    def between(self, start, end, limit=100):
+        return self.conn.execute("""
+            SELECT id, asked_at, question, answer FROM conversations
+            WHERE asked_at >= ? AND asked_at < ? ORDER BY asked_at LIMIT ?
+        """, (start, end, limit)).fetchall()
+
+    def search(self, text, limit=20):
+        if self.has_fts:
+            # quote the text so it is matched as a phrase, not parsed as FTS syntax
+            phrase = '"' + text.replace('"', '""') + '"'
+            return self.conn.execute("""
+                SELECT c.id, c.asked_at, c.question, c.answer FROM conversations_fts
+                JOIN conversations c ON c.id = conversations_fts.rowid
+                WHERE conversations_fts MATCH ? ORDER BY c.id DESC LIMIT ?
+            """, (phrase, limit)).fetchall()
+        pattern = f"%{text}%"
+        return self.conn.execute("""
+            SELECT id, asked_at, question, answer FROM conversations
+            WHERE question LIKE ? OR answer LIKE ? ORDER BY id DESC LIMIT ?
+        """, (pattern, pattern, limit)).fetchall()
+
+    def import_legacy(self, file_name):
+        # one-time import of the old "User: ...\nAI: ...\n\n" text file, streamed line by line
+        asked_at = os.path.getmtime(file_name)
+        rows = []
+        question, answer, field = None, None, None
+        with open(file_name, "r") as f:
+            for line in f:
+                if line.startswith("User: "):
+                    if question is not None:
+                        rows.append((asked_at, question, (answer or "").rstrip("\n")))
+                    question, answer, field = line[6:].rstrip("\n"), None, "question"
+                elif line.startswith("AI: ") and field == "question":
+                    answer, field = line[4:], "answer"
+                elif field == "answer":
+                    answer += line
+                elif field == "question":
+                    question += "\n" + line.rstrip("\n")
+                if len(rows) >= 10000:
+                    self.add_many(rows)
+                    rows = []
+        if question is not None:
+            rows.append((asked_at, question, (answer or "").rstrip("\n")))
+        self.add_many(rows)
+
+    def close(self):
+        self.conn.close()
+
+_history_stores = {}
+
+# Function to get the (shared) history store, importing the old text history once
+def get_history_store(file_name=HISTORY_FILE):
+    store = _history_stores.get(file_name)
+    if store is None:
+        store = _history_stores[file_name] = HistoryStore(file_name)
+        if file_name == HISTORY_FILE and os.path.exists(LEGACY_HISTORY_FILE):
+            store.import_legacy(LEGACY_HISTORY_FILE)
+            os.replace(LEGACY_HISTORY_FILE, LEGACY_HISTORY_FILE + ".imported")
+    return store
+
+# Function to check if there is any saved history
+def has_history(file_name=HISTORY_FILE):
+    if not os.path.exists(file_name) and not (file_name == HISTORY_FILE and os.path.exists(LEGACY_HISTORY_FILE)):
+        return False
+    return get_history_store(file_name).count() > 0
+
 # Function to save conversation history
-def save_conversation(question, answer, file_name="conversation_history.txt"):
+def save_conversation(question, answer, file_name=HISTORY_FILE):
     try:
-        with open(file_name, "a") as f:
-            f.write(f"User: {question}\nAI: {answer}\n\n")
+        get_history_store(file_name).add(question, answer)
     except Exception as e:
         print(f"Error saving conversation: {e}")
         return
@@ -29,7 +361,7 @@ def save_conversation(question, answer, file_name="conversation_history.txt"):
 # Function to handle user greeting and clear data
 def get_user_name():
     name_file = "name.txt"
-    conversation_file = "conversation_history.txt"
+    conversation_file = HISTORY_FILE
     
     # Check if name file exists and read it
     if os.path.exists(name_file) and os.path.getsize(name_file) > 0:
@@ -42,8 +374,8 @@ def get_user_name():
             f.write(name)
         print(f"\nNice to meet you, {name}! Your name has been saved for future sessions.")
     
-    # Ask to clear data if conversation file exists and contains data
-    if os.path.exists(conversation_file) and os.path.getsize(conversation_file) > 0:
+    # Ask to clear data if conversation history contains data
+    if has_history(conversation_file):
         clear_data_choice = input("\nDo you want to clear your saved conversation history? (yes/no): ").strip().lower()
         if clear_data_choice == "yes":
             clear_data(conversation_file)
@@ -52,20 +384,60 @@ def get_user_name():
 
 # Function to clear data
 def clear_data(file_name):
+    # close the history store first so its database files can be removed
+    store = _history_stores.pop(file_name, None)
+    if store is not None:
+        store.close()
     if os.path.exists(file_name):
         os.remove(file_name)
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(file_name + suffix):
+                os.remove(file_name + suffix)
         print(f"{file_name} has been cleared.")
     else:
         print(f"No {file_name} file found to delete.")
 
-# Function to display previous conversation history
-def display_previous_conversations(file_name="conversation_history.txt"):
-    if os.path.exists(file_name) and os.path.getsize(file_name) > 0:
-        print("\nPrevious Conversations:")
-        with open(file_name, "r") as f:
-            print(f.read())
-    else:
+# Function to print a list of saved conversations
+def print_conversations(rows):
+    for _, asked_at, question, answer in rows:
+        stamp = datetime.fromtimestamp(asked_at).strftime("%Y-%m-%d %H:%M")
+        print(f"[{stamp}]\nUser: {question}\nAI: {answer}\n")
+
+# Function to display previous conversation history one page at a time
+def display_previous_conversations(file_name=HISTORY_FILE, page_size=10):
+    if not has_history(file_name):
         print("\nNo previous conversations found.")
+        return
+    store = get_history_store(file_name)
+    print(f"\nPrevious Conversations ({store.count()} saved, newest first):")
+    before_id = None
+    while True:
+        rows = store.page(before_id, page_size)
+        if rows:
+            # pages come newest first; show each page in reading order
+            print_conversations(reversed(rows))
+            before_id = rows[-1][0]
+        else:
+            print("No older conversations.")
+        choice = input("[Enter] Older | [S] Search | [D] Date range | [Q] Done: ").strip().lower()
+        if choice == "q":
+            break
+        elif choice == "s":
+            text = input("Search for: ").strip()
+            if text:
+                found = store.search(text)
+                print_conversations(found)
+                print(f"{len(found)} matching conversations shown.")
+        elif choice == "d":
+            try:
+                start = datetime.strptime(input("From (YYYY-MM-DD): ").strip(), "%Y-%m-%d").timestamp()
+                end = datetime.strptime(input("To (YYYY-MM-DD): ").strip(), "%Y-%m-%d").timestamp() + 86400
+            except ValueError:
+                print("Invalid date. Please use YYYY-MM-DD.")
+                continue
+            print_conversations(store.between(start, end))
+        elif not rows:
+            break
 
 # Function to display a good bye message with a fun quote
 def goodbye_message(user_name):
@@ -79,13 +451,13 @@ def goodbye_message(user_name):
     print(f"\nGoodbye, {user_name}! {random.choice(quotes)}")
 
 # Main Function
-def main():
+def main(use_cache=True):
     user_name = get_user_name()  # Get the user's name
     print("\n\t  Welcome to the AI-Powered Q & A Bot!")
     print("\n" + "_" * 30)
     
     # After clear data prompt, ask to show previous conversations if available
-    if os.path.exists("conversation_history.txt") and os.path.getsize("conversation_history.txt") > 0:
+    if has_history():
         show_history = input("\nDo you want to view your previous conversation history? (yes/no): ").strip().lower()
         if show_history == "yes":
             display_previous_conversations()
@@ -93,15 +465,27 @@ def main():
     print("\nType your questions below.")
     print("Type 'Exit' to quit")
 
+    # One session for the whole conversation keeps context and skips per-question setup
+    session = QnASession()
+    # Repeat questions are answered from the cache unless started with --no-cache
+    cache = AnswerCache() if use_cache else None
+
     while True:
         try:
             question = input(f"\n{user_name}, what's your question? ").strip()
             if question.lower() == "exit":
                 goodbye_message(user_name)  # Display goodbye message
                 break  # Exit the loop and end the program
-            # Get response from bot
-            answer = ask_question(question)
-            print(f"AI's Answer: {answer}\n")
+            # Get response from bot, printing it as it streams in
+            print("AI's Answer: ", end="", flush=True)
+            streamed = []
+            def show(text):
+                streamed.append(text)
+                print(text, end="", flush=True)
+            answer = ask_question(question, session, show, cache)
+            if answer != "".join(streamed):
+                print(answer, end="")  # error messages are returned, not streamed
+            print("\n")
             # Save conversation history
             save_conversation(question, answer)
         except KeyboardInterrupt:
@@ -113,10 +497,24 @@ def main():
             goodbye_message(user_name)  # Display goodbye message
             break  # Exit loop on unforeseen error
 
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Answer cache: {stats['hits']} hits, {stats['misses']} misses")
+
 # Run Program
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI-Powered Q & A Bot")
+    parser.add_argument("--no-cache", action="store_true", help="always ask the model, ignoring cached answers")
+    parser.add_argument("--batch", metavar="FILE", help='answer every line of FILE ("-" for stdin) as JSONL')
+    parser.add_argument("--output", metavar="FILE", help="batch output file (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=8, help="questions in flight at once in batch mode")
+    parser.add_argument("--fake", action="store_true", help="use the offline fake model in batch mode")
+    args = parser.parse_args()
     try:
-        main()
+        if args.batch:
+            batch_main(args.batch, args.output, args.concurrency, not args.no_cache, args.fake)
+        else:
+            main(use_cache=not args.no_cache)
     except Exception as e:
         print(f"Critical error encountered: {e}")
         # Handle critical error gracefully
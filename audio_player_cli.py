@@ -1,23 +1,99 @@
 import time  # Import time for sleep functionality
-import yt_dlp  # Import yt_dlp for downloading YouTube audio
-import vlc  # Import VLC for media playback
 import os  # Import os for clearing the console
+import re  # Import re for pulling the video ID out of a URL
+import json  # Import json for saving resolved stream URLs between runs
+import threading  # Import threading to guard the shared extractor and cache
+import queue  # Import queue to hand songs to the background downloader
+
+# yt_dlp and vlc are slow to import, so they are imported inside the functions that use them
+from urllib.parse import urlparse, parse_qs  # Import URL helpers to read the stream expiry
+
+# Options for yt_dlp to extract audio URL
+YDL_OPTS = {
+    'format': 'bestaudio/best',  # Fetch the best quality audio
+    'quiet': True,  # Suppress verbose output
+    'extract_flat': True,  # Extract metadata without downloading
+}
+
+# One long-lived extractor reused for every song instead of building a new one each time
+_ydl = None
+_ydl_lock = threading.Lock()
+
+def get_ydl():
+    global _ydl
+    if _ydl is None:
+        import yt_dlp  # Import yt_dlp for downloading YouTube audio
+        _ydl = yt_dlp.YoutubeDL(YDL_OPTS)
+    return _ydl
+
+# Function to get the 11-character video ID from a YouTube URL (falls back to the URL itself)
+def video_id(youtube_url):
+    match = re.search(r'(?:v=|youtu\.be/|shorts/|embed/)([\w-]{11})', youtube_url)
+    return match.group(1) if match else youtube_url
+
+# Cache of resolved stream URLs, kept until the signed URL expires and saved between runs
+class StreamCache:
+    def __init__(self, path="stream_cache.json", default_ttl=3600, margin=60):
+        self.path = path
+        self.default_ttl = default_ttl  # Used when the URL carries no expiry
+        self.margin = margin  # Stop using a URL this many seconds before it expires
+        self.lock = threading.Lock()
+        self.entries = {}
+        try:
+            with open(path, "r") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+        # Drop anything that expired while the player was closed
+        now = time.time()
+        self.entries = {key: entry for key, entry in self.entries.items() if entry['expires'] > now}
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry['expires'] <= time.time():
+                return None
+            return entry['url']
+
+    def set(self, key, url):
+        # Signed googlevideo URLs carry their expiry time as ?expire=<unix time>
+        expire = parse_qs(urlparse(url).query).get('expire')
+        expires = int(expire[0]) if expire else time.time() + self.default_ttl
+        with self.lock:
+            self.entries[key] = {'url': url, 'expires': expires - self.margin}
+            # Write to a temp file first so a crash never leaves a half-written cache
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(temp_path, self.path)
+
+stream_cache = StreamCache()
 
 # Function to fetch the audio URL of a YouTube video
-def get_audio_url(youtube_url):
+def get_audio_url(youtube_url, quiet=False):
+    key = video_id(youtube_url)
+    cached = stream_cache.get(key)
+    if cached:
+        return cached
+    # Only a cache miss needs the extractor, so a cached replay never pays for this import
+    import yt_dlp  # Import yt_dlp for downloading YouTube audio
+    if quiet:
+        # Background prefetch: no messages, no pause, just report failure
+        try:
+            with _ydl_lock:
+                info = get_ydl().extract_info(youtube_url, download=False)
+            stream_cache.set(key, info['url'])
+            return info['url']
+        except Exception:
+            return None
     try:
         print("\nFetching Song...")
         print("\nWait a second...\n")
-        # Options for yt_dlp to extract audio URL
-        ydl_opts = {
-            'format': 'bestaudio/best',  # Fetch the best quality audio
-            'quiet': True,  # Suppress verbose output
-            'extract_flat': True,  # Extract metadata without downloading
-        }
         # Extract audio stream URL
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(youtube_url, download=False)
-            return info['url']
+        with _ydl_lock:
+            info = get_ydl().extract_info(youtube_url, download=False)
+        stream_cache.set(key, info['url'])
+        return info['url']
     except yt_dlp.DownloadError as e:
         # Specific error for yt-dlp download issues
         print(f"Download error: {e}")
@@ -33,12 +109,124 @@ def get_audio_url(youtube_url):
     time.sleep(2)
     return None
 
+# Local copies of played songs, evicted least-recently-played first once over the size cap
+class AudioCache:
+    def __init__(self, cache_dir="audio_cache", max_bytes=500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.downloads = queue.Queue()
+        self.pending = set()
+        # The folder is only created once something is written, so importing this module leaves no trace
+        # Hit/miss counts are kept across runs
+        self.stats_path = os.path.join(cache_dir, "stats.json")
+        self.stats = {'hits': 0, 'misses': 0, 'bytes_saved': 0}
+        try:
+            with open(self.stats_path, "r") as f:
+                self.stats.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        self.downloader = None
+
+    def _files(self):
+        # Cached songs are saved as <video id>.<ext>; skip the stats file and partial downloads
+        files = {}
+        if not os.path.isdir(self.cache_dir):
+            return files
+        for entry in os.scandir(self.cache_dir):
+            name, ext = os.path.splitext(entry.name)
+            if entry.is_file() and ext not in (".json", ".part", ".ytdl"):
+                files[name] = entry
+        return files
+
+    def lookup(self, key):
+        """Return the local file for a video ID, or None"""
+        with self.lock:
+            entry = self._files().get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                self._save_stats()
+                return None
+            # Touch the file so eviction sees it as recently played
+            os.utime(entry.path)
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += entry.stat().st_size
+            self._save_stats()
+            return entry.path
+
+    def add_later(self, youtube_url, key):
+        """Queue a song to be downloaded into the cache in the background"""
+        with self.lock:
+            if key in self.pending:
+                return
+            self.pending.add(key)
+            # One background downloader, started on first use, so caching never competes much with playback
+            if self.downloader is None:
+                self.downloader = threading.Thread(target=self._download_loop, daemon=True)
+                self.downloader.start()
+        self.downloads.put((youtube_url, key))
+
+    def _download_loop(self):
+        import yt_dlp  # Import yt_dlp for downloading YouTube audio
+        options = {
+            'format': 'bestaudio/best',  # Same audio the player streams
+            'quiet': True,
+            'noprogress': True,
+            'outtmpl': os.path.join(self.cache_dir, '%(id)s.%(ext)s'),
+        }
+        # A separate extractor so long downloads never block the shared one
+        with yt_dlp.YoutubeDL(options) as ydl:
+            while True:
+                youtube_url, key = self.downloads.get()
+                try:
+                    ydl.download([youtube_url])
+                    self.evict()
+                except Exception:
+                    pass  # Caching is best effort; the song still streams
+                with self.lock:
+                    self.pending.discard(key)
+
+    def evict(self):
+        """Delete least recently played songs until the cache fits in max_bytes"""
+        with self.lock:
+            entries = sorted(self._files().values(), key=lambda entry: entry.stat().st_mtime)
+            total = sum(entry.stat().st_size for entry in entries)
+            for entry in entries:
+                if total <= self.max_bytes:
+                    break
+                total -= entry.stat().st_size
+                os.remove(entry.path)
+
+    def _save_stats(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.stats_path, "w") as f:
+            json.dump(self.stats, f)
+
+    def summary(self):
+        total = self.stats['hits'] + self.stats['misses']
+        hit_rate = self.stats['hits'] / total * 100 if total else 0.0
+        return f"Audio cache: {hit_rate:.0f}% hit rate, {self.stats['bytes_saved'] / (1024 * 1024):.1f} MB saved"
+
+audio_cache = AudioCache()
+
+# Function to get something VLC can play: the cached file if we have one, otherwise the stream URL
+def resolve_song(youtube_url, quiet=False):
+    key = video_id(youtube_url)
+    local_path = audio_cache.lookup(key)
+    if local_path:
+        return local_path
+    url = get_audio_url(youtube_url, quiet)
+    if url:
+        audio_cache.add_later(youtube_url, key)  # Cache it for next time while it streams
+    return url
+
 # Function to play a song
 # Function to play a song with volume control
 def play_song(song):
+    import vlc  # Import VLC for media playback
     try:
         print("\nStarting the song...")
-        url = get_audio_url(song)  # Fetch the audio URL
+        url = resolve_song(song)  # Fetch the audio URL (or the cached file)
         if not url:
             print("Could not fetch the audio URL. Aborting...")
             time.sleep(2)
@@ -92,6 +280,116 @@ def play_song(song):
         print("Wait for 2 seconds and try again...")
         time.sleep(2)
 
+# Function to play several songs back to back, fetching upcoming songs while one plays
+def play_queue(songs, prefetch=2):
+    import vlc  # Import VLC for media playback
+    try:
+        print("\nStarting the queue...")
+        first_url = resolve_song(songs[0])
+        if not first_url:
+            print("Could not fetch the first song. Aborting...")
+            time.sleep(2)
+            return
+
+        # A media list player moves to the next song as soon as one ends, with no gap
+        instance = vlc.Instance()
+        media_list = instance.media_list_new([first_url])
+        list_player = instance.media_list_player_new()
+        list_player.set_media_list(media_list)
+        player = list_player.get_media_player()
+
+        # MRLs in queue order; the event only carries a raw pointer, so the playing song is found by its MRL
+        queued_mrls = [media_list.item_at_index(0).get_mrl()]  # VLC turns file paths into file:// MRLs
+        state = {'index': 0, 'stop': False}
+        condition = threading.Condition()
+
+        def on_next_item(event):
+            # Runs on a VLC thread; don't call back into VLC here, just wake the prefetcher
+            with condition:
+                condition.notify()
+
+        def position():
+            # Returns (index of the playing song, songs queued)
+            media = player.get_media()
+            mrl = media.get_mrl() if media is not None else None
+            with condition:
+                matches = [i for i, queued in enumerate(queued_mrls) if queued == mrl]
+                if matches:
+                    # The same song can be queued twice; prefer the match nearest the last known spot
+                    state['index'] = min(matches, key=lambda i: abs(i - state['index']))
+                return state['index'], len(queued_mrls)
+
+        def prefetcher():
+            for song in songs[1:]:
+                # Stay at most `prefetch` songs ahead of the one playing
+                while not state['stop']:
+                    index, queued = position()
+                    if queued - index <= prefetch:
+                        break
+                    with condition:
+                        condition.wait(timeout=1)  # Never wait on VLC's lock while holding ours
+                if state['stop']:
+                    return
+                url = resolve_song(song, quiet=True)
+                if not url:
+                    continue  # Skip songs that can't be fetched
+                media = instance.media_new(url)
+                media.parse_with_options(vlc.MediaParseFlag.network, 0)  # Start buffering metadata early
+                media_list.lock()
+                media_list.add_media(media)
+                media_list.unlock()
+                with condition:
+                    queued_mrls.append(media.get_mrl())
+
+        list_player.event_manager().event_attach(vlc.EventType.MediaListPlayerNextItemSet, on_next_item)
+        prefetch_thread = threading.Thread(target=prefetcher, daemon=True)
+        prefetch_thread.start()
+        list_player.play()
+
+        # Set an initial volume level
+        volume = 50
+        player.audio_set_volume(volume)
+        print(f"Volume set to {volume}%.")
+
+        # Infinite loop to handle user controls
+        while True:
+            print(f"\nPlaying song {position()[0] + 1} of {len(songs)}")
+            print("Controls: [P] Pause/Resume | [N] Next | [B] Back | [Q] Quit | [+] Increase Volume | [-] Decrease Volume")
+            command = input("Enter command: ").strip().lower()
+
+            if command == "p":  # Pause or resume the music
+                list_player.pause()
+                print("Music paused/resumed.")
+            elif command == "n":  # Skip to the next song
+                if list_player.next() == -1:
+                    print("No next song ready yet.")
+            elif command == "b":  # Go back to the previous song
+                if list_player.previous() == -1:
+                    print("Already at the first song.")
+            elif command == "+":  # Increase volume
+                volume = min(100, volume + 10)  # Max volume is 100%
+                player.audio_set_volume(volume)
+                print(f"Volume increased to {volume}%.")
+            elif command == "-":  # Decrease volume
+                volume = max(0, volume - 10)  # Min volume is 0%
+                player.audio_set_volume(volume)
+                print(f"Volume decreased to {volume}%.")
+            elif command == "q":  # Quit the player and return to the menu
+                with condition:
+                    state['stop'] = True
+                    condition.notify()
+                list_player.stop()
+                print("Exiting player.")
+                break
+            else:
+                # Handle invalid commands
+                print("Invalid command. Try again.")
+    except Exception as e:
+        # General error handling
+        print(f"Some error occurred while playing the queue. Error: {e}")
+        print("Wait for 2 seconds and try again...")
+        time.sleep(2)
+
 # Function to display a list of pre-defined songs and allow selection
 def list_of_songs():
     songs = [
@@ -107,7 +405,8 @@ def list_of_songs():
             print("\n1. Dil Tu Jaan Tu by Gurnazar Ft. Kritika Yadav")
             print("2. Millionaire by YoYo Honey Singh")
             print("3. Tere Hawaale by Arijit Singh")
-            print("4. Exit")
+            print("4. Play all")
+            print("5. Exit")
             choice = int(input("\nEnter your choice: "))
             if choice == 1:
                 play_song(songs[0])  # Play the first song
@@ -116,6 +415,8 @@ def list_of_songs():
             elif choice == 3:
                 play_song(songs[2])  # Play the third song
             elif choice == 4:
+                play_queue(songs)  # Play every song back to back
+            elif choice == 5:
                 # Exit the list and return to the main menu
                 print("\nThanks for using my music player!")
                 break
@@ -142,7 +443,8 @@ def main():
             print("\n" + "_"*30)
             print("\n1. Wanna play my list of songs?")
             print("2. Wanna play your own song?")
-            print("3. Exit")
+            print("3. Wanna play your own list of songs?")
+            print("4. Exit")
             choice = int(input("\nEnter your choice: "))
             if choice == 1:
                 list_of_songs()  # Show the list of pre-defined songs
@@ -151,7 +453,13 @@ def main():
                 song_url = input("\nEnter the song URL: ").strip()
                 play_song(song_url)  # Play the user's custom song
             elif choice == 3:
+                os.system("cls")  # Clear the screen
+                song_urls = [url.strip() for url in input("\nEnter the song URLs separated by commas: ").split(",") if url.strip()]
+                if song_urls:
+                    play_queue(song_urls)  # Play the user's songs back to back
+            elif choice == 4:
                 # Exit the program
+                print(audio_cache.summary())
                 print(f"\nThanks for using my music player! Have a nice day! {chr(0x1F642)}")
                 break
             else:
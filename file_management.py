@@ -1,13 +1,365 @@
 import os
+import errno
+import argparse
+import json
 import shutil
+import sqlite3
+import hashlib
 from datetime import datetime
 import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+def copy_file_fast(src, dst, progress=None, chunk_size=8 * 1024 * 1024):
+    """Copy src to dst with kernel-side copying where available, reporting progress(copied, total)"""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        total = os.fstat(in_fd).st_size
+        copied = 0
+        # Prefer copy_file_range, then sendfile, then a plain read/write loop
+        method = "copy_file_range" if hasattr(os, "copy_file_range") else "sendfile" if hasattr(os, "sendfile") else "read"
+        while copied < total:
+            count = min(chunk_size, total - copied)
+            try:
+                if method == "copy_file_range":
+                    sent = os.copy_file_range(in_fd, out_fd, count, copied, copied)
+                elif method == "sendfile":
+                    os.lseek(out_fd, copied, os.SEEK_SET)
+                    sent = os.sendfile(out_fd, in_fd, copied, count)
+                else:
+                    fsrc.seek(copied)
+                    fdst.seek(copied)
+                    sent = fdst.write(fsrc.read(count))
+            except OSError as e:
+                # Not supported between these filesystems, drop to the next method and retry the chunk
+                if method != "read" and e.errno in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP):
+                    method = "sendfile" if method == "copy_file_range" and hasattr(os, "sendfile") else "read"
+                    continue
+                raise
+            if sent == 0:
+                # Some filesystems (procfs, FUSE, NFS) report 0 instead of an error; treat it like one
+                if method != "read":
+                    method = "sendfile" if method == "copy_file_range" and hasattr(os, "sendfile") else "read"
+                    continue
+                break
+            copied += sent
+            if progress is not None:
+                progress(copied, total)
+    # A short copy must never be swapped in for the source, so callers get an error instead
+    if copied != total:
+        raise OSError(errno.EIO, f"Copied {copied} of {total} bytes", src)
+    shutil.copystat(src, dst)
+
+def move_file(src, dst, progress=None):
+    """Move src to dst with a rename where possible and a kernel-side copy across devices"""
+    try:
+        os.rename(src, dst)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    # Copy next to the destination first so an interrupted copy never looks finished
+    partial_path = dst + ".part"
+    try:
+        copy_file_fast(src, partial_path, progress)
+        os.replace(partial_path, dst)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    os.remove(src)
+
+def copy_progress_printer(file_name, step=10, min_size=64 * 1024 * 1024):
+    """Return a progress callback that prints every `step` percent for large files"""
+    last = [-step]
+    def report(copied, total):
+        if total < min_size:
+            return
+        percent = copied * 100 // total if total else 100
+        if percent - last[0] >= step:
+            last[0] = percent
+            print(f"Copying {file_name}: {percent}%")
+    return report
+
+class MoveJournal:
+    """Append-only journal of moves so an interrupted batch can be resumed or rolled back"""
+    def __init__(self, journal_path="move_journal.jsonl", sync_every=100):
+        self.journal_path = journal_path
+        self.sync_every = sync_every
+        self.lock = threading.Lock()
+        self.in_flight = set()
+        self.unsynced = 0
+        self.file = open(journal_path, "a")
+
+    def _write(self, op, src, dst):
+        self.file.write(json.dumps({'op': op, 'src': src, 'dst': dst}) + "\n")
+        self.file.flush()
+
+    def begin(self, src, dst):
+        with self.lock:
+            self._write('begin', src, dst)
+            self.in_flight.add((src, dst))
+
+    def complete(self, src, dst):
+        with self.lock:
+            self._write('done', src, dst)
+            self.in_flight.discard((src, dst))
+            # Completions are synced in batches rather than one fsync per move
+            self.unsynced += 1
+            if self.unsynced >= self.sync_every:
+                os.fsync(self.file.fileno())
+                self.unsynced = 0
+
+    def entries(self):
+        """Return ([all begun moves], [moves begun but never completed]) from the journal"""
+        begun = {}
+        done = set()
+        with self.lock:
+            self.file.flush()
+            with open(self.journal_path, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn last line from a crash mid-write
+                        continue
+                    key = (record['src'], record['dst'])
+                    if record['op'] == 'begin':
+                        begun[key] = True
+                    else:
+                        done.add(key)
+        return list(begun), [key for key in begun if key not in done]
+
+    def resume(self):
+        """Finish moves that were interrupted, without re-scanning the folder"""
+        _, pending = self.entries()
+        resumed = 0
+        for src, dst in pending:
+            if os.path.exists(dst + ".part"):
+                os.remove(dst + ".part")
+            if not os.path.exists(src):
+                continue
+            if not os.path.exists(dst):
+                move_file(src, dst, copy_progress_printer(os.path.basename(src)))
+                resumed += 1
+            elif os.path.getsize(src) == os.path.getsize(dst):
+                # reserve_destination picked a free name, so dst is the finished copy and
+                # only removing the source was interrupted
+                os.remove(src)
+                resumed += 1
+        self.commit()
+        if resumed:
+            print(f"Resumed {resumed} interrupted moves from {self.journal_path}")
+        return resumed
+
+    def rollback(self):
+        """Move every journaled file back to where it came from"""
+        begun, _ = self.entries()
+        rolled_back = 0
+        for src, dst in reversed(begun):
+            if os.path.exists(dst + ".part"):
+                os.remove(dst + ".part")
+            if os.path.exists(dst) and not os.path.exists(src):
+                move_file(dst, src, copy_progress_printer(os.path.basename(dst)))
+                rolled_back += 1
+        self.commit()
+        print(f"Rolled back {rolled_back} moves from {self.journal_path}")
+        return rolled_back
+
+    def commit(self):
+        """Sync the journal and truncate it once no move is in flight"""
+        with self.lock:
+            if self.in_flight:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            else:
+                self.file.truncate(0)
+            self.unsynced = 0
+
+    def close(self):
+        self.commit()
+        self.file.close()
+
+class OrganizerIndex:
+    """On-disk record of files already handled, so restarts only process the delta"""
+    def __init__(self, db_path="organizer_index.db", batch_size=500):
+        self.batch_size = batch_size
+        self.buffer = []
+        self.lock = threading.Lock()
+        # One shared connection guarded by the lock; sweep and queue workers both record
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS organized_files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                destination TEXT,
+                organized_at REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS scan_checkpoints (
+                directory TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                scanned_at REAL NOT NULL
+            )
+        ''')
+        self.conn.commit()
+
+    def seen(self, file_path, mtime_ns, size):
+        """Return True if this exact version of the file was already handled"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT mtime_ns, size FROM organized_files WHERE path = ?', (file_path,)
+            ).fetchone()
+        return row is not None and row[0] == mtime_ns and row[1] == size
+
+    def record(self, file_path, mtime_ns, size, destination=None):
+        """Remember a handled file; destination is None for files left in place"""
+        with self.lock:
+            self.buffer.append((file_path, mtime_ns, size, destination, time.time()))
+            if len(self.buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self.buffer:
+            return
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO organized_files (path, mtime_ns, size, destination, organized_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', self.buffer)
+        self.conn.commit()
+        self.buffer = []
+
+    def checkpoint(self, directory):
+        """Return the directory mtime recorded at the end of the last scan, if any"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT mtime_ns FROM scan_checkpoints WHERE directory = ?', (directory,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_checkpoint(self, directory, mtime_ns):
+        with self.lock:
+            self._flush_locked()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO scan_checkpoints (directory, mtime_ns, scanned_at) VALUES (?, ?, ?)',
+                (directory, mtime_ns, time.time())
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self._flush_locked()
+            self.conn.close()
+
+class DuplicateFinder:
+    """Finds byte-identical files in a category folder: size first, then partial hash, then full hash"""
+    def __init__(self, partial_size=64 * 1024, chunk_size=1024 * 1024):
+        self.partial_size = partial_size
+        self.chunk_size = chunk_size
+        self.lock = threading.Lock()
+        # folder -> {size: set(paths)}, built lazily with one scandir per folder
+        self.sizes = {}
+        # path -> ((mtime_ns, size), digest); entries go stale when the file changes
+        self.partial_hashes = {}
+        self.full_hashes = {}
+
+    def _folder_sizes(self, folder):
+        with self.lock:
+            sizes = self.sizes.get(folder)
+            if sizes is None:
+                sizes = {}
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            sizes.setdefault(entry.stat().st_size, set()).add(entry.path)
+                self.sizes[folder] = sizes
+            return sizes
+
+    def _hash(self, cache, file_path, full):
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return None
+        key = (stat_result.st_mtime_ns, stat_result.st_size)
+        with self.lock:
+            cached = cache.get(file_path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        digest = hashlib.blake2b()
+        try:
+            with open(file_path, "rb") as f:
+                if full:
+                    # Read in chunks so multi-GB files never sit in memory
+                    for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                        digest.update(chunk)
+                else:
+                    digest.update(f.read(self.partial_size))
+        except OSError:
+            return None
+        with self.lock:
+            cache[file_path] = (key, digest.digest())
+        return digest.digest()
+
+    def find_duplicate(self, file_path, size, folder):
+        """Return the path of an identical file in folder, or None"""
+        sizes = self._folder_sizes(folder)
+        with self.lock:
+            candidates = list(sizes.get(size, ()))
+        if not candidates:
+            return None
+        partial = self._hash(self.partial_hashes, file_path, full=False)
+        if partial is None:
+            return None
+        candidates = [path for path in candidates if self._hash(self.partial_hashes, path, full=False) == partial]
+        if not candidates:
+            return None
+        # A file no larger than the partial read is already fully compared
+        if size <= self.partial_size:
+            return candidates[0]
+        full = self._hash(self.full_hashes, file_path, full=True)
+        if full is None:
+            return None
+        for path in candidates:
+            if self._hash(self.full_hashes, path, full=True) == full:
+                return path
+        return None
+
+    def add(self, file_path, size, folder):
+        """Track a file that was just moved into folder"""
+        with self.lock:
+            if folder in self.sizes:
+                self.sizes[folder].setdefault(size, set()).add(file_path)
+
+    def forget(self, file_path):
+        with self.lock:
+            self.partial_hashes.pop(file_path, None)
+            self.full_hashes.pop(file_path, None)
+
 class FileOrganizer:
-    def __init__(self, path):
+    def __init__(self, path, index=None, dedup=None, journal=None):
         self.path = path
+        # Optional MoveJournal recording every move for resume or rollback
+        self.journal = journal
+        # Optional OrganizerIndex; without one every restart re-examines every file
+        self.index = index
+        # Dedup mode: None keeps every copy, "drop" deletes identical files,
+        # "hardlink" keeps the name but links it to the existing copy
+        if dedup not in (None, "drop", "hardlink"):
+            raise ValueError(f"Unknown dedup mode: {dedup}")
+        self.dedup = dedup
+        self.duplicates = DuplicateFinder() if dedup else None
+        # Destination names chosen by in-flight moves, so concurrent workers never collide
+        self.reserved = set()
+        self.reserve_lock = threading.Lock()
         # Define category mappings
         self.categories = {
             'Images': ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp'],
@@ -17,6 +369,12 @@ class FileOrganizer:
             'Archives': ['.zip', '.rar', '.7z', '.tar', '.gz'],
             'Code': ['.py', '.js', '.html', '.css', '.java', '.cpp', '.php']
         }
+        # Precomputed extension -> category lookup so each file is a single dict hit
+        self.extension_map = {
+            extension: category
+            for category, extensions in self.categories.items()
+            for extension in extensions
+        }
         
     def create_folders(self):
         """Create category folders if they don't exist"""
@@ -25,52 +383,336 @@ class FileOrganizer:
             if not os.path.exists(folder_path):
                 os.makedirs(folder_path)
 
+    def in_category_folder(self, file_path):
+        """Return True if the path lives inside one of the category folders"""
+        relative = os.path.relpath(os.path.abspath(file_path), os.path.abspath(self.path))
+        return relative.split(os.sep, 1)[0] in self.categories
+
     def organize_file(self, file_path):
         """Organize a single file into appropriate category folder"""
         if os.path.isfile(file_path):
-            file_extension = os.path.splitext(file_path)[1].lower()
-            
-            # Find the category for the file
-            for category, extensions in self.categories.items():
-                if file_extension in extensions:
-                    destination_folder = os.path.join(self.path, category)
-                    file_name = os.path.basename(file_path)
-                    destination_path = os.path.join(destination_folder, file_name)
-                    
-                    # Handle duplicate files
-                    if os.path.exists(destination_path):
-                        base_name = os.path.splitext(file_name)[0]
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        new_name = f"{base_name}_{timestamp}{file_extension}"
-                        destination_path = os.path.join(destination_folder, new_name)
-                    
-                    try:
-                        shutil.move(file_path, destination_path)
-                        print(f"Moved {file_name} to {category}")
-                    except Exception as e:
-                        print(f"Error moving {file_name}: {str(e)}")
-                    break
+            return self.move_to_category(file_path)
+        return False
+
+    def move_to_category(self, file_path, stat_result=None):
+        """Move a file already known to be a regular file into its category folder"""
+        file_name = os.path.basename(file_path)
+        file_extension = os.path.splitext(file_name)[1].lower()
+
+        # Find the category for the file
+        category = self.extension_map.get(file_extension)
+        if category is None:
+            return False
+
+        if (self.index is not None or self.duplicates is not None) and stat_result is None:
+            try:
+                stat_result = os.stat(file_path)
+            except OSError:
+                return False
+
+        destination_folder = os.path.join(self.path, category)
+
+        existing = None
+        if self.duplicates is not None:
+            existing = self.duplicates.find_duplicate(file_path, stat_result.st_size, destination_folder)
+            if existing is not None and self.dedup == "drop":
+                try:
+                    os.remove(file_path)
+                    self.duplicates.forget(file_path)
+                    print(f"Dropped {file_name}, identical to {os.path.basename(existing)} in {category}")
+                    if self.index is not None:
+                        self.index.record(file_path, stat_result.st_mtime_ns, stat_result.st_size, existing)
+                    return True
+                except Exception as e:
+                    print(f"Error removing duplicate {file_name}: {str(e)}")
+                    return False
+
+        destination_path = self.reserve_destination(destination_folder, file_name)
+        try:
+            if self.journal is not None:
+                self.journal.begin(file_path, destination_path)
+            if existing is not None and self._link_duplicate(existing, file_path, destination_path):
+                print(f"Linked {file_name} to identical {os.path.basename(existing)} in {category}")
+            else:
+                move_file(file_path, destination_path, copy_progress_printer(file_name))
+                print(f"Moved {file_name} to {category}")
+            if self.journal is not None:
+                self.journal.complete(file_path, destination_path)
+            if self.duplicates is not None:
+                self.duplicates.forget(file_path)
+                self.duplicates.add(destination_path, stat_result.st_size, destination_folder)
+            if self.index is not None:
+                self.index.record(file_path, stat_result.st_mtime_ns, stat_result.st_size, destination_path)
+            return True
+        except Exception as e:
+            print(f"Error moving {file_name}: {str(e)}")
+            return False
+        finally:
+            with self.reserve_lock:
+                self.reserved.discard(destination_path)
+
+    def reserve_destination(self, destination_folder, file_name):
+        """Pick a free destination path, adding a timestamp and counter on collisions"""
+        base_name, file_extension = os.path.splitext(file_name)
+        destination_path = os.path.join(destination_folder, file_name)
+        with self.reserve_lock:
+            # Handle duplicate files
+            if os.path.exists(destination_path) or destination_path in self.reserved:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                new_name = f"{base_name}_{timestamp}{file_extension}"
+                destination_path = os.path.join(destination_folder, new_name)
+                counter = 1
+                # Several collisions within the same second get a counter instead of overwriting
+                while os.path.exists(destination_path) or destination_path in self.reserved:
+                    new_name = f"{base_name}_{timestamp}_{counter}{file_extension}"
+                    destination_path = os.path.join(destination_folder, new_name)
+                    counter += 1
+            self.reserved.add(destination_path)
+        return destination_path
+
+    def _link_duplicate(self, existing, file_path, destination_path):
+        # Hard links only work on the same filesystem; otherwise fall back to a normal move
+        try:
+            os.link(existing, destination_path)
+        except OSError:
+            return False
+        os.remove(file_path)
+        return True
+
+    def initial_sweep(self, max_workers=8, recursive=False):
+        """Organize every file already in the folder using a bounded thread pool"""
+        start_time = time.perf_counter()
+        scanned = 0
+        skipped = 0
+        moved = 0
+        # Cap in-flight moves so huge folders don't queue every path at once
+        max_pending = max_workers * 4
+        pending = set()
+        scanned_dirs = []
+        # Directories with a move that failed (locked file, permissions) are not checkpointed,
+        # so the next start looks at them again
+        future_dirs = {}
+        failed_dirs = set()
+        directories = [self.path]
+
+        def collect(done):
+            succeeded = 0
+            for future in done:
+                if future.result():
+                    succeeded += 1
+                else:
+                    failed_dirs.add(future_dirs[future])
+                del future_dirs[future]
+            return succeeded
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while directories:
+                directory = directories.pop()
+                # A directory whose mtime matches the last checkpoint has no new entries
+                unchanged = False
+                if self.index is not None:
+                    unchanged = self.index.checkpoint(directory) == os.stat(directory).st_mtime_ns
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        # scandir reuses the dirent type, so no extra stat per file
+                        if entry.is_dir(follow_symlinks=False):
+                            # Category folders hold finished work and are never re-walked
+                            if recursive and not (directory == self.path and entry.name in self.categories):
+                                directories.append(entry.path)
+                            continue
+                        if unchanged or not entry.is_file():
+                            continue
+                        scanned += 1
+                        stat_result = None
+                        if self.index is not None:
+                            stat_result = entry.stat()
+                            if self.index.seen(entry.path, stat_result.st_mtime_ns, stat_result.st_size):
+                                skipped += 1
+                                continue
+                        if os.path.splitext(entry.name)[1].lower() not in self.extension_map:
+                            if self.index is not None:
+                                self.index.record(entry.path, stat_result.st_mtime_ns, stat_result.st_size)
+                            continue
+                        future = executor.submit(self.move_to_category, entry.path, stat_result)
+                        future_dirs[future] = directory
+                        pending.add(future)
+                        if len(pending) >= max_pending:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            moved += collect(done)
+                scanned_dirs.append(directory)
+            done, _ = wait(pending)
+            moved += collect(done)
+
+        if self.journal is not None:
+            self.journal.commit()
+
+        # Checkpoint after the moves, since moving files out changes each directory's mtime
+        if self.index is not None:
+            for directory in scanned_dirs:
+                if directory in failed_dirs:
+                    continue
+                try:
+                    self.index.set_checkpoint(directory, os.stat(directory).st_mtime_ns)
+                except OSError:
+                    pass
+
+        elapsed = time.perf_counter() - start_time
+        rate = scanned / elapsed if elapsed > 0 else 0.0
+        print(f"Initial sweep: scanned {scanned} files, skipped {skipped} already indexed, "
+              f"moved {moved} in {elapsed:.2f}s ({rate:.0f} files/sec)")
+        return scanned, moved
+
+class EventQueue:
+    """Debounced intake queue that coalesces file events per path and feeds a worker pool"""
+    def __init__(self, organizer, workers=4, debounce=1.0, poll_interval=0.25):
+        self.organizer = organizer
+        self.workers = workers
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        # path -> [first_seen, last_event, last_size]; repeated events only refresh last_event
+        self.pending = {}
+        self.ready = queue.Queue()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.threads = []
+        # Latency is measured from the first event for a path until it has been organized
+        self.processed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def start(self):
+        """Start the debounce thread and the worker threads"""
+        self.threads.append(threading.Thread(target=self._debounce_loop, daemon=True))
+        for _ in range(self.workers):
+            self.threads.append(threading.Thread(target=self._worker_loop, daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        """Stop all threads; files still waiting to settle are left for the next sweep"""
+        self.stop_event.set()
+        for _ in range(self.workers):
+            self.ready.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def submit(self, file_path):
+        """Record an event for a path, merging it with any pending event for the same path"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.pending.get(file_path)
+            if entry is None:
+                self.pending[file_path] = [now, now, None]
+            else:
+                entry[1] = now
+
+    def _debounce_loop(self):
+        while not self.stop_event.wait(self.poll_interval):
+            now = time.monotonic()
+            with self.lock:
+                quiet = [(path, entry) for path, entry in self.pending.items() if now - entry[1] >= self.debounce]
+            for file_path, entry in quiet:
+                try:
+                    size = os.path.getsize(file_path)
+                except OSError:
+                    # The file vanished (deleted or moved away) before it settled
+                    size = None
+                with self.lock:
+                    # A newer event arrived while we were checking, keep waiting
+                    if self.pending.get(file_path) is not entry or entry[1] > now:
+                        continue
+                    if size is None:
+                        del self.pending[file_path]
+                    elif size == entry[2]:
+                        # Size unchanged across a full debounce window, the writer is done
+                        del self.pending[file_path]
+                        self.ready.put((file_path, entry[0]))
+                    else:
+                        entry[1] = now
+                        entry[2] = size
+
+    def _worker_loop(self):
+        while True:
+            item = self.ready.get()
+            if item is None:
+                break
+            file_path, first_seen = item
+            self.organizer.organize_file(file_path)
+            latency = time.monotonic() - first_seen
+            with self.lock:
+                self.processed += 1
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+
+    def stats(self):
+        """Return queue depth and latency figures for monitoring the backlog"""
+        with self.lock:
+            return {
+                'pending': len(self.pending),
+                'ready': self.ready.qsize(),
+                'processed': self.processed,
+                'avg_latency': self.total_latency / self.processed if self.processed else 0.0,
+                'max_latency': self.max_latency,
+            }
 
 class FileEventHandler(FileSystemEventHandler):
-    def __init__(self, organizer):
+    def __init__(self, organizer, event_queue=None, ignored=()):
         self.organizer = organizer
+        self.event_queue = event_queue
+        # The organizer's own files (journal, index); their writes would otherwise come back as events
+        self.ignored = {os.path.abspath(path) for path in ignored}
+
+    def handle_path(self, file_path):
+        if os.path.abspath(file_path) in self.ignored:
+            return
+        # Without a queue, fall back to organizing directly on the observer thread
+        if self.event_queue is None:
+            self.organizer.organize_file(file_path)
+        elif not self.organizer.in_category_folder(file_path):
+            # Never re-organize files that already landed in a category folder
+            self.event_queue.submit(file_path)
 
     def on_created(self, event):
         if not event.is_directory:
-            self.organizer.organize_file(event.src_path)
+            self.handle_path(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory and self.event_queue is not None:
+            self.handle_path(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory and self.event_queue is not None:
+            self.handle_path(event.dest_path)
 
-def main():
+def main(workers=4, debounce=1.0, report_interval=10, index_path=None, recursive=False, dedup=None,
+         journal_path="move_journal.jsonl"):
     # Set the path to monitor (current directory by default)
     path = os.getcwd()
+
+    # Optional persistent index so a restart only processes new or changed files
+    index = OrganizerIndex(index_path) if index_path else None
     
+    # Finish any batch that was interrupted last time before looking at new files
+    journal = MoveJournal(journal_path) if journal_path else None
+    if journal is not None:
+        journal.resume()
+
     # Create and setup the file organizer
-    organizer = FileOrganizer(path)
+    organizer = FileOrganizer(path, index, dedup, journal)
     organizer.create_folders()
     
+    # Queue events so bursts are coalesced and half-written files are left alone
+    event_queue = EventQueue(organizer, workers=workers, debounce=debounce)
+    event_queue.start()
+
     # Set up file system monitoring
-    event_handler = FileEventHandler(organizer)
+    own_files = [journal_path] if journal is not None else []
+    if index_path:
+        own_files += [index_path + suffix for suffix in ("", "-journal", "-wal", "-shm")]
+    event_handler = FileEventHandler(organizer, event_queue, own_files)
     observer = Observer()
-    observer.schedule(event_handler, path, recursive=False)
+    observer.schedule(event_handler, path, recursive=recursive)
     observer.start()
     
     print(f"Started monitoring {path}")
@@ -78,17 +720,41 @@ def main():
     
     try:
         # Organize existing files
-        for file_name in os.listdir(path):
-            file_path = os.path.join(path, file_name)
-            organizer.organize_file(file_path)
+        organizer.initial_sweep(recursive=recursive)
             
-        # Keep the script running
+        # Keep the script running, reporting the backlog while there is one
+        last_report = time.monotonic()
         while True:
             time.sleep(1)
+            if time.monotonic() - last_report >= report_interval:
+                last_report = time.monotonic()
+                if journal is not None:
+                    journal.commit()
+                stats = event_queue.stats()
+                if stats['pending'] or stats['ready']:
+                    print(f"Queue: {stats['pending']} settling, {stats['ready']} ready, "
+                          f"{stats['processed']} done, avg latency {stats['avg_latency']:.2f}s")
     except KeyboardInterrupt:
         observer.stop()
         print("\nStopped monitoring")
     observer.join()
+    event_queue.stop()
+    if journal is not None:
+        journal.close()
+    if index is not None:
+        index.close()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Organize the current folder into category folders and keep watching it")
+    parser.add_argument("--workers", type=int, default=4, help="threads moving files at the same time")
+    parser.add_argument("--debounce", type=float, default=1.0, help="seconds a file must stay unchanged before it is moved")
+    parser.add_argument("--report-interval", type=float, default=10, help="seconds between queue reports")
+    parser.add_argument("--index", metavar="PATH", help="SQLite index so restarts skip files already organized")
+    parser.add_argument("--recursive", action="store_true", help="also organize files in subfolders")
+    parser.add_argument("--dedup", choices=["drop", "hardlink"], help="what to do with duplicate files")
+    parser.add_argument("--journal", default="move_journal.jsonl", help="journal used to resume interrupted moves")
+    parser.add_argument("--no-journal", action="store_true", help="move files without journaling them")
+    args = parser.parse_args()
+    main(workers=args.workers, debounce=args.debounce, report_interval=args.report_interval,
+         index_path=args.index, recursive=args.recursive, dedup=args.dedup,
+         journal_path=None if args.no_journal else args.journal)
\ No newline at end of file
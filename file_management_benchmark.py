@@ -0,0 +1,196 @@
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import tracemalloc
+import contextlib
+from datetime import datetime
+from watchdog.events import FileCreatedEvent
+from file_management import FileOrganizer, EventQueue, FileEventHandler
+
+# Extension mix used when none is given: mostly known categories plus some unknown files
+DEFAULT_EXTENSIONS = {'.jpg': 30, '.pdf': 20, '.txt': 15, '.mp3': 10, '.mp4': 5, '.zip': 5, '.py': 5, '.xyz': 10}
+
+def parse_mix(text):
+    """Parse an extension mix like ".jpg:3,.pdf:1" into {".jpg": 3, ".pdf": 1}"""
+    mix = {}
+    for item in text.split(","):
+        extension, _, weight = item.partition(":")
+        mix[extension.strip()] = float(weight or 1)
+    return mix
+
+def random_size(rng, mean_size, distribution):
+    # Files in drop folders are mostly small with a long tail, hence lognormal by default
+    if distribution == "fixed":
+        return mean_size
+    if distribution == "uniform":
+        return rng.randint(0, 2 * mean_size)
+    return int(rng.lognormvariate(0, 1) * mean_size / 1.65)
+
+def create_files(folder, count, mean_size, distribution, extensions, duplicate_ratio, seed):
+    """Create synthetic files in folder and return their paths"""
+    rng = random.Random(seed)
+    names = list(extensions)
+    weights = [extensions[name] for name in names]
+    contents = []
+    paths = []
+    for i in range(count):
+        extension = rng.choices(names, weights)[0]
+        if contents and rng.random() < duplicate_ratio:
+            # Reuse earlier bytes so dedup mode has identical files to find
+            data = rng.choice(contents)
+        else:
+            data = rng.randbytes(random_size(rng, mean_size, distribution))
+            if len(contents) < 1000:
+                contents.append(data)
+        path = os.path.join(folder, f"file_{i:07d}{extension}")
+        with open(path, "wb") as f:
+            f.write(data)
+        paths.append(path)
+    return paths
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarize(name, count, elapsed, latencies, peak_memory):
+    return {
+        'scenario': name,
+        'files': count,
+        'seconds': round(elapsed, 4),
+        'files_per_sec': round(count / elapsed, 1) if elapsed > 0 else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'peak_memory_mb': round(peak_memory / (1024 * 1024), 2) if peak_memory is not None else None,
+    }
+
+def bench_sweep(folder, count, workers, dedup, trace_memory=False):
+    """Time FileOrganizer.initial_sweep on a prepared folder"""
+    organizer = FileOrganizer(folder, dedup=dedup)
+    organizer.create_folders()
+    latencies = []
+    lock = threading.Lock()
+    move = organizer.move_to_category
+
+    def timed_move(*args):
+        start = time.perf_counter()
+        result = move(*args)
+        with lock:
+            latencies.append(time.perf_counter() - start)
+        return result
+    organizer.move_to_category = timed_move
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    # Per-file prints would dominate the timings, so they are discarded
+    with contextlib.redirect_stdout(io.StringIO()):
+        organizer.initial_sweep(max_workers=workers)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return summarize("sweep", count, elapsed, latencies, peak)
+
+def bench_events(folder, paths, workers, debounce, dedup, trace_memory=False):
+    """Feed created events through FileEventHandler and time them until organized"""
+    organizer = FileOrganizer(folder, dedup=dedup)
+    organizer.create_folders()
+    submitted = {}
+    latencies = []
+    lock = threading.Lock()
+    finished = threading.Event()
+    organize = organizer.organize_file
+
+    def timed_organize(file_path):
+        result = organize(file_path)
+        with lock:
+            latencies.append(time.perf_counter() - submitted[file_path])
+            if len(latencies) == len(paths):
+                finished.set()
+        return result
+    organizer.organize_file = timed_organize
+
+    event_queue = EventQueue(organizer, workers=workers, debounce=debounce, poll_interval=debounce / 4)
+    handler = FileEventHandler(organizer, event_queue)
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        event_queue.start()
+        for path in paths:
+            submitted[path] = time.perf_counter()
+            handler.on_created(FileCreatedEvent(path))
+        finished.wait()
+        event_queue.stop()
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return summarize("events", len(paths), elapsed, latencies, peak)
+
+def run_scenario(scenario, args, trace_memory):
+    """Run one scenario on a fresh synthetic folder and remove it afterwards"""
+    folder = tempfile.mkdtemp(prefix=f"organizer_bench_{scenario}_")
+    try:
+        paths = create_files(folder, args.files, args.size, args.distribution,
+                             args.extensions, args.duplicates, args.seed)
+        if scenario == "sweep":
+            return bench_sweep(folder, len(paths), args.workers, args.dedup, trace_memory)
+        return bench_events(folder, paths, args.workers, args.debounce, args.dedup, trace_memory)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FileOrganizer on synthetic folders")
+    parser.add_argument("--files", type=int, default=10000, help="number of files to create")
+    parser.add_argument("--size", type=int, default=4096, help="mean file size in bytes")
+    parser.add_argument("--distribution", choices=["lognormal", "uniform", "fixed"], default="lognormal")
+    parser.add_argument("--extensions", type=parse_mix, default=DEFAULT_EXTENSIONS,
+                        help='extension weights, e.g. ".jpg:3,.pdf:1,.xyz:1"')
+    parser.add_argument("--duplicates", type=float, default=0.0, help="fraction of files that copy earlier content")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--debounce", type=float, default=0.05, help="event queue debounce in seconds")
+    parser.add_argument("--dedup", choices=["drop", "hardlink"], default=None)
+    parser.add_argument("--scenario", choices=["sweep", "events", "all"], default="all")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action="store_true", help="skip the separate peak-memory pass")
+    parser.add_argument("--output", default="bench_results.jsonl", help="JSON lines file results are appended to")
+    args = parser.parse_args()
+
+    results = []
+    scenarios = ["sweep", "events"] if args.scenario == "all" else [args.scenario]
+    for scenario in scenarios:
+        # tracemalloc slows every allocation down several times, so timings come from an
+        # untraced pass and peak memory from a second pass over an identical folder
+        result = run_scenario(scenario, args, trace_memory=False)
+        if not args.no_memory:
+            result['peak_memory_mb'] = run_scenario(scenario, args, trace_memory=True)['peak_memory_mb']
+        results.append(result)
+        peak = "skipped" if result['peak_memory_mb'] is None else f"{result['peak_memory_mb']} MB"
+        print(f"{result['scenario']}: {result['files_per_sec']} files/sec, "
+              f"p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms, peak {peak}")
+
+    # One line per run keeps results easy to diff between releases
+    record = {
+        'timestamp': datetime.now().isoformat(timespec="seconds"),
+        'python': sys.version.split()[0],
+        'params': {key: value for key, value in vars(args).items() if key != "output"},
+        'results': results,
+    }
+    with open(args.output, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"Results appended to {args.output}")
+
+if __name__ == "__main__":
+    main()
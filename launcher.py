@@ -0,0 +1,92 @@
+import os
+import sys
+import runpy
+import argparse
+import subprocess
+
+# Subcommand -> (module, description). Each tool keeps its own menu and command line.
+TOOLS = {
+    'files': ('file_management', "Organize the current folder and keep watching it"),
+    'whatsapp': ('whatsapp_automation', "Schedule and send WhatsApp messages"),
+    'qna': ('ai_qna_bot', "AI-powered Q & A bot"),
+    'music': ('audio_player_cli', "Play YouTube audio in the terminal"),
+    'youtube': ('youtube_video_downloader', "Download YouTube videos"),
+    'qr': ('qr_code_generator', "Generate QR codes in the terminal"),
+    'password': ('password_generator', "Generate secure passwords"),
+    'tts': ('text_to_speech', "Convert text to speech"),
+}
+
+def run_tool(name, args):
+    """Run a tool as if it was started directly, passing the remaining arguments through"""
+    module = TOOLS[name][0]
+    # Tools live next to this file; make them importable from any working directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    sys.argv = [module + ".py"] + args
+    runpy.run_module(module, run_name="__main__")
+
+def measure_import(module):
+    """Import a module in a fresh interpreter with -X importtime and return (total_us, [(us, direct import)])"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        # Missing dependency or syntax error; show the last line of the traceback
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    children = []
+    for line in result.stderr.splitlines():
+        # Lines look like: "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name[1:]
+        # Each package is listed after its own imports, nested two spaces deeper
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 1:
+            children.append((int(cumulative), name.strip()))
+        elif depth == 0:
+            if name == module:
+                return int(cumulative), sorted(children, reverse=True)
+            children = []
+    return 0, []
+
+def import_report(budget_ms, top=5):
+    """Print the cold import time of every tool and return False if any is over budget"""
+    within_budget = True
+    print(f"Cold import times (budget {budget_ms} ms):")
+    for name, (module, _) in TOOLS.items():
+        try:
+            total, imports = measure_import(module)
+        except RuntimeError as e:
+            print(f"  {name:<10} could not import: {e}")
+            continue
+        total_ms = total / 1000
+        flag = "OK  " if total_ms <= budget_ms else "SLOW"
+        if total_ms > budget_ms:
+            within_budget = False
+        slowest = ", ".join(f"{package} {us / 1000:.1f} ms" for us, package in imports[:top])
+        print(f"  {flag} {name:<10} {total_ms:8.1f} ms  {slowest}")
+    return within_budget
+
+def main():
+    parser = argparse.ArgumentParser(description="Code It With Me tools launcher")
+    parser.add_argument("--import-report", action="store_true", help="show how long each tool takes to import")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="import time budget per tool for the report")
+    parser.add_argument("tool", nargs="?", choices=TOOLS, help="tool to run")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments passed through to the tool")
+    args = parser.parse_args()
+
+    if args.import_report:
+        sys.exit(0 if import_report(args.budget_ms) else 1)
+    if args.tool is None:
+        print("Available tools:")
+        for name, (_, description) in TOOLS.items():
+            print(f"  {name:<10} {description}")
+        print("\nUsage: python launcher.py <tool> [arguments]")
+        return
+    run_tool(args.tool, args.args)
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,71 @@
 import time
-import qrcode  # Import the qrcode library for generating QR codes
 import os  # Import os for file and directory operations
-import requests  # Import requests for making HTTP requests
+import re
+import sys
+import csv
+import copy
+import json
+import hashlib
+import argparse
+from bisect import bisect_left
+from functools import lru_cache
+# qrcode, requests and the process pool are imported inside the functions that use them, so the menu shows up fast
+
+# Encoded QR codes kept in memory; repeated data skips encoding and mask selection
+QR_CACHE_SIZE = 1024
+
+# ANSI foreground codes for color names; background codes are 10 higher
+COLOR_CODES = {
+    "black": 30,
+    "red": 31,
+    "green": 32,
+    "yellow": 33,
+    "blue": 34,
+    "magenta": 35,
+    "cyan": 36,
+    "white": 37,
+}
+
+def color_number(color, is_background=False):
+    # Unknown names and "reset" map to 0, which resets all attributes
+    code = COLOR_CODES.get(color.lower())
+    if code is None:
+        return 0
+    return code + 10 if is_background else code
 
 def terminal_color(color, is_background=False):
-    # Map color names to ANSI escape codes for terminal output
-    color_map = {
-        "black": 40 if is_background else 30,
-        "red": 41 if is_background else 31,
-        "green": 42 if is_background else 32,
-        "yellow": 43 if is_background else 33,
-        "blue": 44 if is_background else 34,
-        "magenta": 45 if is_background else 35,
-        "cyan": 46 if is_background else 36,
-        "white": 47 if is_background else 37,
-        "reset": 0
-    }
     # Return the ANSI escape code for the specified color
-    return f"\033[{color_map.get(color.lower(), 0)}m"
+    return f"\033[{color_number(color, is_background)}m"
+
+def render_qr_matrix(matrix, fill_color="black", back_color="white", compact=False):
+    """
+    Build the whole QR code as one string, ready for a single write to the terminal.
+    :param matrix: Rows of booleans, True for dark modules (qr.get_matrix())
+    :param fill_color: Color name for dark modules
+    :param back_color: Color name for light modules
+    :param compact: Pack two rows into each line with half-block characters
+    :return: The rendered frame
+    """
+    # Foreground draws dark modules and background shows light ones, so each line needs
+    # a single color code at the start instead of one per module
+    color = f"\033[{color_number(fill_color)};{color_number(back_color, is_background=True)}m"
+    reset = terminal_color("reset")
+    lines = []
+    if compact:
+        # One character per module wide and two modules tall keeps the code square
+        glyphs = {(False, False): " ", (True, False): "▀", (False, True): "▄", (True, True): "█"}
+        for y in range(0, len(matrix), 2):
+            top = matrix[y]
+            bottom = matrix[y + 1] if y + 1 < len(matrix) else [False] * len(top)
+            lines.append(color + "".join(glyphs[cell] for cell in zip(top, bottom)) + reset)
+    else:
+        for row in matrix:
+            lines.append(color + "".join("██" if col else "  " for col in row) + reset)
+    # Resetting before each newline stops the background color from bleeding into the next line
+    return "\n".join(lines) + "\n"
 
 def fetch_random_joke():
+    import requests  # Import requests for making HTTP requests
     try:
         # Set headers to accept JSON response
         headers = {'Accept': 'application/json'}
@@ -37,34 +83,77 @@ def fetch_random_joke():
         # Return a default joke in case of an error
         return "Why don't scientists trust atoms? Because they make up everything!"
 
-def generate_qr_terminal(data, box_size=1, border=2, fill_color="black", back_color="white"):
+def estimate_version(data, error_correction):
+    """
+    Work out the smallest QR version that holds data, without encoding it.
+    :param data: Data to encode
+    :param error_correction: One of the qrcode.constants.ERROR_CORRECT_* values
+    :return: Version 1-40, or None if the data is too long for any version
+    """
+    from qrcode import util
+    # Split the data the same way QRCode.add_data does, so digit and
+    # uppercase runs are counted in their denser numeric/alphanumeric modes
+    chunks = [(chunk.mode, len(chunk)) for chunk in util.optimal_data_chunks(data, minimum=20)]
+    payload = 0
+    for mode, length in chunks:
+        if mode == util.MODE_NUMBER:
+            payload += 10 * (length // 3) + (0, 4, 7)[length % 3]
+        elif mode == util.MODE_ALPHA_NUM:
+            payload += 11 * (length // 2) + 6 * (length % 2)
+        else:
+            payload += 8 * length
+    # Data bits available in each version (index 0 is unused)
+    limits = util.BIT_LIMIT_TABLE[error_correction]
+    version = 1
+    while version <= 40:
+        # Each chunk also needs a 4-bit mode indicator and a length field that widens at versions 10 and 27
+        bits = payload + sum(4 + util.length_in_bits(mode, version) for mode, _ in chunks)
+        fitted = bisect_left(limits, bits, version)
+        if fitted == version:
+            return version
+        version = fitted
+    return None
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def _encode_qr(data, error_correction, version):
+    import qrcode
+    qr = qrcode.QRCode(version=version, error_correction=error_correction, border=0)
+    qr.add_data(data)
+    # A known version skips the fit search; None falls back to it
+    qr.make(fit=version is None)
+    return qr
+
+def get_qr(data, error_correction=None, version=None, box_size=10, border=4):
+    """
+    Return an encoded QRCode, reusing the matrix when the same data was encoded before.
+    :param data: Data to encode
+    :param error_correction: One of the qrcode.constants.ERROR_CORRECT_* values (default L)
+    :param version: Pin a version 1-40; by default it is worked out from the data length
+    :param box_size: Pixels per module in saved images
+    :param border: Modules of quiet zone around the code
+    :return: A QRCode ready for get_matrix() and make_image()
+    """
+    import qrcode
+    if error_correction is None:
+        error_correction = qrcode.constants.ERROR_CORRECT_L
+    if version is None:
+        version = estimate_version(data, error_correction)
+    # The cached code is shared, so callers get a shallow copy with their own size settings;
+    # the module matrix itself is only read after encoding
+    qr = copy.copy(_encode_qr(data, error_correction, version))
+    qr.box_size = box_size
+    qr.border = border
+    return qr
+
+def generate_qr_terminal(data, box_size=1, border=2, fill_color="black", back_color="white", compact=False,
+                         version=None):
     try:
-        # Create a QRCode object with specified settings
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=box_size,
-            border=border,
-        )
-        # Add data to the QR code
-        qr.add_data(data)
-        # Optimize the QR code size
-        qr.make(fit=True)
-
-        # Get terminal color codes for fill and background
-        fill_color_code = terminal_color(fill_color)
-        back_color_code = terminal_color(back_color, is_background=True)
-
-        # Iterate over the QR code matrix to print it in the terminal
-        for row in qr.get_matrix():
-            for col in row:
-                if col:
-                    # Print filled cells with the specified fill color
-                    print(f"{fill_color_code}██{terminal_color('reset')}", end="")
-                else:
-                    # Print empty cells with the specified background color
-                    print(f"{back_color_code}  {terminal_color('reset')}", end="")
-            print()  # New line after each row
+        # Get the encoded QR code, from the cache if this data was shown before
+        qr = get_qr(data, version=version, box_size=box_size, border=border)
+
+        # Render the whole code first and write it in one go; a write per module is slow over SSH
+        sys.stdout.write(render_qr_matrix(qr.get_matrix(), fill_color, back_color, compact))
+        sys.stdout.flush()
 
         # Indicate successful QR code generation
         print("\nQR Code successfully displayed in the terminal.")
@@ -74,6 +163,17 @@ def generate_qr_terminal(data, box_size=1, border=2, fill_color="black", back_co
         print(f"An error occurred while generating the QR code: {e}")
         return None
 
+def qr_filename(data):
+    """
+    Build a file name (without extension) that is readable and unique per data.
+    :param data: Data encoded in the QR code
+    :return: Up to 40 safe characters of the data plus a hash of all of it
+    """
+    # The hash keeps names distinct when the readable prefix is the same
+    slug = re.sub(r'[^A-Za-z0-9._-]+', '_', data)[:40].strip('._') or "qr"
+    digest = hashlib.blake2b(data.encode('utf-8'), digest_size=8).hexdigest()
+    return f"{slug}_{digest}"
+
 def save_qr_code(qr, data, fill_color="black", back_color="white"):
     try:
         # Define the folder name for saving QR codes
@@ -82,8 +182,8 @@ def save_qr_code(qr, data, fill_color="black", back_color="white"):
         if not os.path.exists(folder_name):
             os.makedirs(folder_name)
 
-        # Create a valid filename by replacing spaces and slashes
-        filename = f"{folder_name}/{data.replace(' ', '_').replace('/', '_')[:50]}.png"
+        # Create a valid filename that can't collide with other data
+        filename = f"{folder_name}/{qr_filename(data)}.png"
         # Generate an image from the QRCode object
         img = qr.make_image(fill_color=fill_color, back_color=back_color)
         # Save the image to the specified filename
@@ -95,6 +195,134 @@ def save_qr_code(qr, data, fill_color="black", back_color="white"):
         # Print an error message if saving fails
         print(f"An error occurred while saving the QR code: {e}")
 
+def read_records(file_path):
+    """
+    Yield the data of each record in a CSV (with a "data" column) or JSONL file.
+    A record without usable data yields a ValueError instead, so one bad line doesn't stop the batch.
+    """
+    with open(file_path, newline='', encoding='utf-8') as f:
+        if file_path.lower().endswith(('.jsonl', '.json')):
+            records = (line for line in f if line.strip())
+        else:
+            records = csv.DictReader(f)
+        for record in records:
+            try:
+                if isinstance(record, str):
+                    record = json.loads(record)
+                # JSON lines may be plain strings or objects with a "data" field
+                data = record if isinstance(record, str) else record['data']
+            except (ValueError, KeyError, TypeError) as e:
+                yield ValueError(f"unreadable record ({type(e).__name__}: {e})")
+                continue
+            if data is None or data == "":
+                yield ValueError("no data")
+                continue
+            yield str(data)
+
+def save_atomically(image, path):
+    # Write next to the target and rename, so an interrupted run never leaves a truncated
+    # file that a rerun would mistake for a finished one
+    temp_path = path + ".part"
+    try:
+        with open(temp_path, "wb") as f:
+            image.save(f)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def generate_qr_files(chunk, folder, formats, fill_color, back_color, box_size, border, version=None):
+    """
+    Write image files for a chunk of records. Runs in a worker process.
+    :return: (written, skipped, errors) where errors is a list of (data, message)
+    """
+    written = 0
+    skipped = 0
+    errors = []
+    for data in chunk:
+        base = os.path.join(folder, qr_filename(data))
+        # Names only depend on the data, so files from an earlier run can be kept
+        if all(os.path.exists(f"{base}.{fmt}") for fmt in formats):
+            skipped += 1
+            continue
+        try:
+            # Both formats are drawn from the same encoded matrix
+            qr = get_qr(data, version=version, box_size=box_size, border=border)
+            if "png" in formats:
+                save_atomically(qr.make_image(fill_color=fill_color, back_color=back_color), f"{base}.png")
+            if "svg" in formats:
+                import qrcode.image.svg
+                save_atomically(qr.make_image(image_factory=qrcode.image.svg.SvgPathImage), f"{base}.svg")
+            written += 1
+        except Exception as e:
+            errors.append((data, str(e)))
+    return written, skipped, errors
+
+def batch_generate(file_path, folder="qr_codes", formats=("png",), workers=None, chunk_size=256,
+                   fill_color="black", back_color="white", box_size=10, border=4, version=None):
+    """
+    Generate QR code images for every record in a CSV or JSONL file using all CPU cores.
+    :param file_path: CSV with a "data" column, or JSONL of strings or {"data": ...} objects
+    :param folder: Folder the images are written to
+    :param formats: Any of "png" and "svg"
+    :param workers: Worker processes (defaults to the CPU count)
+    :param chunk_size: Records sent to a worker at a time
+    :param version: Pin a QR version 1-40 for every code; by default it is worked out per record
+    :return: (written, skipped, failed) counts, where failed includes unreadable records
+    """
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    workers = workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+    written = 0
+    skipped = 0
+    failed = 0
+    # Records are read lazily and only a few chunks per worker are queued at once,
+    # so memory stays flat however long the input file is
+    max_pending = workers * 2
+    pending = set()
+
+    def collect(done):
+        nonlocal written, skipped, failed
+        for future in done:
+            chunk_written, chunk_skipped, errors = future.result()
+            written += chunk_written
+            skipped += chunk_skipped
+            failed += len(errors)
+            for data, message in errors:
+                print(f"Failed {data[:50]!r}: {message}")
+        elapsed = time.perf_counter() - start_time
+        print(f"{written + skipped + failed} records, {written / elapsed:.0f} codes/sec", end="\r")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunk = []
+        for record_number, data in enumerate(read_records(file_path), start=1):
+            if isinstance(data, ValueError):
+                print(f"Skipping record {record_number}: {data}")
+                failed += 1
+                continue
+            chunk.append(data)
+            if len(chunk) < chunk_size:
+                continue
+            pending.add(executor.submit(generate_qr_files, chunk, folder, formats,
+                                        fill_color, back_color, box_size, border, version))
+            chunk = []
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        if chunk:
+            pending.add(executor.submit(generate_qr_files, chunk, folder, formats,
+                                        fill_color, back_color, box_size, border, version))
+        collect(pending)
+
+    elapsed = time.perf_counter() - start_time
+    rate = written / elapsed if elapsed > 0 else 0.0
+    print(f"\nBatch complete: {written} written, {skipped} already existed, {failed} failed "
+          f"in {elapsed:.1f}s ({rate:.0f} codes/sec with {workers} workers).")
+    return written, skipped, failed
+
 def main():
     # Welcome message for the user
     print("Welcome to the Terminal QR Code Generator! (Suggestion: Open terminal in full screen)")
@@ -145,10 +373,15 @@ def main():
                 border = int(input("Enter border size (default is 4): ").strip() or 4)
                 fill_color = input("Enter fill color (default is black): ").strip() or "black"
                 back_color = input("Enter background color (default is white): ").strip() or "white"
+                compact = input("Use compact half-height display? (yes/no, default is no): ").strip().lower() == "yes"
+                version = input("Enter QR version 1-40 (default is automatic): ").strip()
+                version = int(version) if version else None
+                if version is not None and not 1 <= version <= 40:
+                    raise ValueError("Version must be between 1 and 40.")
                 
                 # Generate the QR code with custom settings
                 print("\nGenerating QR code with custom settings...")
-                qr = generate_qr_terminal(data, box_size, border, fill_color, back_color)
+                qr = generate_qr_terminal(data, box_size, border, fill_color, back_color, compact, version)
                 
                 if qr:
                     # Ask the user if they want to save the QR code
@@ -193,5 +426,27 @@ def main():
             os.system("cls")  # Clear the terminal screen
 
 if __name__ == "__main__":
-    # Run the main function if the script is executed directly
-    main()
+    if len(sys.argv) > 1:
+        # Non-interactive batch mode, e.g. python qr_code_generator.py skus.csv --svg
+        parser = argparse.ArgumentParser(description="Generate QR code images for every record in a CSV or JSONL file")
+        parser.add_argument("file", help='CSV with a "data" column, or JSONL of strings or {"data": ...} objects')
+        parser.add_argument("--output", default="qr_codes", help="folder the images are written to")
+        parser.add_argument("--svg", action="store_true", help="also write SVG files")
+        parser.add_argument("--no-png", action="store_true", help="skip PNG files (use with --svg)")
+        parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+        parser.add_argument("--chunk-size", type=int, default=256, help="records sent to a worker at a time")
+        parser.add_argument("--fill-color", default="black")
+        parser.add_argument("--back-color", default="white")
+        parser.add_argument("--box-size", type=int, default=10)
+        parser.add_argument("--border", type=int, default=4)
+        parser.add_argument("--version", type=int, choices=range(1, 41), metavar="1-40",
+                            help="QR version for every code (default: smallest that fits each record)")
+        args = parser.parse_args()
+        formats = tuple(fmt for fmt, wanted in (("png", not args.no_png), ("svg", args.svg)) if wanted)
+        if not formats:
+            parser.error("nothing to write: --no-png needs --svg")
+        batch_generate(args.file, args.output, formats, args.workers, args.chunk_size,
+                       args.fill_color, args.back_color, args.box_size, args.border, args.version)
+    else:
+        # Run the main function if the script is executed directly
+        main()
@@ -1,18 +1,59 @@
 import sqlite3
+import csv
+import json
+import sys
+import os
+import socket
+import zlib
+from functools import lru_cache, partial
 from datetime import datetime, timezone
-from twilio.rest import Client
-import pytz
-import schedule
+from concurrent.futures import ThreadPoolExecutor, wait
 import time
+import random
+import heapq
+import threading
+
+# twilio, pytz and schedule are imported where they are used so the CLI starts quickly
 
 # Twilio credentials (replace with your own)
 ACCOUNT_SID = 'your_account_sid'
 AUTH_TOKEN = 'your_auth_token'
 FROM_WHATSAPP_NUMBER = 'whatsapp:+14155238886'  # Twilio sandbox number
 
+# Dispatcher tuning: parallel sends, sustained messages/sec, burst size and retry count
+SEND_WORKERS = 8
+SEND_RATE = 20
+SEND_BURST = 20
+MAX_RETRIES = 5
+
+# Claimed messages stay leased to one dispatcher for this many seconds, then can be reclaimed.
+# CLAIM_BATCH is an upper bound; each batch is sized so it can be sent well within a lease.
+LEASE_SECONDS = 300
+CLAIM_BATCH = 1000
+
+# Identifies this dispatcher process in lease_owner
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Path of the scheduler database and the per-thread connections reused by every function
+DB_PATH = 'scheduler.db'
+_local = threading.local()
+
+def get_connection():
+    # Reuse one connection per thread instead of reconnecting on every call
+    conn = getattr(_local, 'connection', None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH)
+        # WAL lets the dispatcher read while new messages are being scheduled
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        # Stable user_id -> shard mapping for dispatchers that split the work
+        conn.create_function('shard_of', 2, lambda user_id, count: zlib.crc32(user_id.encode()) % count, deterministic=True)
+        _local.connection = conn
+    return conn
+
 def setup_database():
     # Connect to the SQLite database (or create it if it doesn't exist)
-    conn = sqlite3.connect('scheduler.db')
+    conn = get_connection()
     cursor = conn.cursor()
 
     # Create a table to store scheduled messages
@@ -27,18 +68,146 @@ def setup_database():
         )
     ''')
 
-    # Commit the changes and close the connection
+    # Lease columns for databases created before several dispatchers could share them
+    columns = {row[1] for row in cursor.execute('PRAGMA table_info(scheduled_messages)')}
+    if 'status' not in columns:
+        cursor.execute("ALTER TABLE scheduled_messages ADD COLUMN status TEXT NOT NULL DEFAULT 'pending'")
+    if 'lease_owner' not in columns:
+        cursor.execute('ALTER TABLE scheduled_messages ADD COLUMN lease_owner TEXT')
+    if 'lease_expires' not in columns:
+        cursor.execute('ALTER TABLE scheduled_messages ADD COLUMN lease_expires REAL')
+
+    # Index due times so the dispatcher only reads messages that are due
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_scheduled_messages_time
+        ON scheduled_messages (scheduled_time)
+    ''')
+
+    # Messages that still failed after all retries are kept here instead of being lost
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS failed_messages (
+            id INTEGER PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            recipient_number TEXT NOT NULL,
+            message_content TEXT NOT NULL,
+            scheduled_time TEXT NOT NULL,
+            timezone TEXT NOT NULL,
+            error TEXT NOT NULL,
+            failed_at TEXT NOT NULL
+        )
+    ''')
+
+    # Commit the changes
     conn.commit()
-    conn.close()
+
+class SendError(Exception):
+    # Raised by send backends; status is the HTTP status code when there is one
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+class TwilioBackend:
+    """Sends through one long-lived Twilio client so HTTP connections are reused"""
+    def __init__(self, account_sid=ACCOUNT_SID, auth_token=AUTH_TOKEN, from_number=FROM_WHATSAPP_NUMBER):
+        from twilio.rest import Client
+        self.client = Client(account_sid, auth_token)
+        self.from_number = from_number
+
+    def send(self, recipient_number, message_content):
+        from twilio.base.exceptions import TwilioRestException
+        try:
+            self.client.messages.create(
+                body=message_content,
+                from_=self.from_number,
+                to=f'whatsapp:{recipient_number}'  # Ensure the number is prefixed with 'whatsapp:'
+            )
+        except TwilioRestException as e:
+            raise SendError(str(e), e.status)
+
+class HttpBackend:
+    """Posts messages to any HTTP endpoint, e.g. a local stand-in server for load tests"""
+    def __init__(self, url, from_number=FROM_WHATSAPP_NUMBER, timeout=10):
+        import requests  # installed alongside twilio
+        self.requests = requests
+        self.session = requests.Session()  # keep-alive across sends
+        self.url = url
+        self.from_number = from_number
+        self.timeout = timeout
+
+    def send(self, recipient_number, message_content):
+        try:
+            response = self.session.post(self.url, timeout=self.timeout, data={
+                'Body': message_content,
+                'From': self.from_number,
+                'To': f'whatsapp:{recipient_number}',
+            })
+        except self.requests.RequestException as e:
+            raise SendError(str(e))
+        if response.status_code >= 400:
+            raise SendError(f"HTTP {response.status_code}: {response.text[:200]}", response.status_code)
+
+class TokenBucket:
+    """Thread-safe token bucket limiting sends to `rate` per second with bursts of `burst`"""
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+_backend = None
+
+# The running DueScheduler, if any, so newly scheduled messages can wake it early
+_due_scheduler = None
+
+def get_backend():
+    # Create the Twilio backend once and share it across every dispatch
+    global _backend
+    if _backend is None:
+        _backend = TwilioBackend()
+    return _backend
+
+def send_with_retry(backend, bucket, recipient_number, message_content, max_retries=MAX_RETRIES):
+    """Send one message, retrying 429 and 5xx responses with exponential backoff"""
+    attempt = 0
+    while True:
+        bucket.acquire()
+        try:
+            backend.send(recipient_number, message_content)
+            print(f"Message sent to {recipient_number}")
+            return None
+        except SendError as e:
+            retryable = e.status is None or e.status == 429 or e.status >= 500
+            if not retryable or attempt >= max_retries:
+                return str(e)
+        except Exception as e:
+            if attempt >= max_retries:
+                return str(e)
+        # Exponential backoff with jitter so workers don't retry in lockstep
+        time.sleep(min(30, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.5))
+        attempt += 1
 
 def schedule_message(user_id, recipient_number, message_content, scheduled_time, timezone_str):
+    import pytz
     # Convert scheduled_time from user's timezone to UTC
-    local_tz = pytz.timezone(timezone_str)
+    local_tz = get_timezone(timezone_str)
     local_time = local_tz.localize(datetime.strptime(scheduled_time, '%Y-%m-%d %H:%M:%S'))
     utc_time = local_time.astimezone(pytz.utc).strftime('%Y-%m-%d %H:%M:%S')
 
     # Connect to the SQLite database
-    conn = sqlite3.connect('scheduler.db')
+    conn = get_connection()
     cursor = conn.cursor()
 
     # Insert the scheduled message into the database
@@ -47,49 +216,322 @@ def schedule_message(user_id, recipient_number, message_content, scheduled_time,
         VALUES (?, ?, ?, ?, ?)
     ''', (user_id, recipient_number, message_content, utc_time, timezone_str))
 
-    # Commit the changes and close the connection
+    # Commit the changes
     conn.commit()
-    conn.close()
+
+    # Wake the dispatcher if this message is due before anything it is waiting for
+    if _due_scheduler is not None:
+        _due_scheduler.notify(utc_time)
 
     print("Message scheduled successfully!")
 
-def send_scheduled_messages():
-    # Connect to the SQLite database
-    conn = sqlite3.connect('scheduler.db')
-    cursor = conn.cursor()
+@lru_cache(maxsize=None)
+def get_timezone(timezone_str):
+    import pytz
+    # pytz.timezone is slow enough to matter when called once per imported row
+    return pytz.timezone(timezone_str)
+
+def read_import_rows(file_path):
+    """
+    Yield (user_id, recipient_number, message_content, scheduled_time, timezone) from CSV or JSONL.
+    A record that can't be read yields a ValueError instead, so one bad line doesn't stop the import.
+    """
+    fields = ('user_id', 'recipient_number', 'message_content', 'scheduled_time', 'timezone')
+    with open(file_path, newline='', encoding='utf-8') as f:
+        if file_path.lower().endswith(('.jsonl', '.json')):
+            records = (line for line in f if line.strip())
+        else:
+            # CSV with a header row naming the same fields
+            records = csv.DictReader(f)
+        for record in records:
+            try:
+                if isinstance(record, str):
+                    record = json.loads(record)
+                row = tuple(record[field] for field in fields)
+            except (ValueError, KeyError, TypeError) as e:
+                yield ValueError(f"unreadable record ({type(e).__name__}: {e})")
+                continue
+            # Short CSV rows fill missing columns with None
+            if None in row:
+                yield ValueError("missing fields")
+                continue
+            yield row
+
+def import_messages(file_path, chunk_size=10000):
+    """Bulk-schedule messages from a CSV or JSONL file in chunked transactions"""
+    import pytz
+    conn = get_connection()
+    start_time = time.perf_counter()
+    imported = 0
+    skipped = 0
+    chunk = []
+
+    def flush():
+        with conn:
+            conn.executemany('''
+                INSERT INTO scheduled_messages (user_id, recipient_number, message_content, scheduled_time, timezone)
+                VALUES (?, ?, ?, ?, ?)
+            ''', chunk)
+        if _due_scheduler is not None:
+            _due_scheduler.notify(min(row[3] for row in chunk))
 
-    # Get the current time in UTC
+    for line_number, row in enumerate(read_import_rows(file_path), start=1):
+        if isinstance(row, ValueError):
+            print(f"Skipping row {line_number}: {row}")
+            skipped += 1
+            continue
+        user_id, recipient_number, message_content, scheduled_time, timezone_str = row
+        try:
+            # Same conversion as schedule_message, with cached tz objects
+            local_time = get_timezone(timezone_str).localize(datetime.fromisoformat(scheduled_time))
+            utc_time = local_time.astimezone(pytz.utc).strftime('%Y-%m-%d %H:%M:%S')
+        except Exception as e:
+            print(f"Skipping row {line_number}: {e}")
+            skipped += 1
+            continue
+        chunk.append((user_id, recipient_number, message_content, utc_time, timezone_str))
+        if len(chunk) >= chunk_size:
+            flush()
+            imported += len(chunk)
+            chunk = []
+    if chunk:
+        flush()
+        imported += len(chunk)
+
+    elapsed = time.perf_counter() - start_time
+    rate = imported / elapsed if elapsed > 0 else 0.0
+    print(f"Imported {imported} messages ({skipped} skipped) in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return imported
+
+def claim_due_messages(shard=None, limit=CLAIM_BATCH, lease_seconds=LEASE_SECONDS):
+    """Atomically lease up to `limit` due messages to this worker and return them"""
+    conn = get_connection()
     current_time = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    now = time.time()
 
-    # Query for messages that are due to be sent
-    cursor.execute('''
-        SELECT id, recipient_number, message_content FROM scheduled_messages
+    # Pending rows, plus rows whose previous owner's lease ran out (e.g. it crashed)
+    query = '''
+        SELECT id FROM scheduled_messages
         WHERE scheduled_time <= ?
-    ''', (current_time,))
+        AND (status = 'pending' OR lease_expires < ?)
+    '''
+    params = [current_time, now]
+    if shard is not None:
+        # shard is (index, count); each dispatcher only sees its share of users
+        query += ' AND shard_of(user_id, ?) = ?'
+        params += [shard[1], shard[0]]
+    query += ' ORDER BY scheduled_time LIMIT ?'
+    params.append(limit)
 
-    messages_to_send = cursor.fetchall()
+    # One UPDATE ... RETURNING so two dispatchers can never claim the same row
+    with conn:
+        rows = conn.execute(f'''
+            UPDATE scheduled_messages
+            SET status = 'claimed', lease_owner = ?, lease_expires = ?
+            WHERE id IN ({query})
+            RETURNING id, user_id, recipient_number, message_content, scheduled_time, timezone
+        ''', [WORKER_ID, now + lease_seconds] + params).fetchall()
+    # RETURNING order is unspecified
+    rows.sort(key=lambda row: row[4])
+    return rows
 
-    # Initialize the Twilio client
-    client = Client(ACCOUNT_SID, AUTH_TOKEN)
+def claim_limit(rate, lease_seconds=LEASE_SECONDS, max_retries=MAX_RETRIES):
+    """Largest batch that can be sent in half a lease even if every message uses all its retries"""
+    # Every attempt takes a token, so a message can cost max_retries + 1 tokens
+    return max(1, min(CLAIM_BATCH, int(rate * lease_seconds / 2 / (max_retries + 1))))
 
-    # Send each scheduled message
-    for message in messages_to_send:
-        message_id, recipient_number, message_content = message
-        client.messages.create(
-            body=message_content,
-            from_=FROM_WHATSAPP_NUMBER,
-            to=f'whatsapp:{recipient_number}'  # Ensure the number is prefixed with 'whatsapp:'
-        )
-        print(f"Message sent to {recipient_number}")
+def renew_lease(ids, lease_seconds=LEASE_SECONDS):
+    """Extend this worker's lease on messages it still owns and return how many it still holds"""
+    conn = get_connection()
+    expires = time.time() + lease_seconds
+    with conn:
+        cursor = conn.executemany('''
+            UPDATE scheduled_messages SET lease_expires = ?
+            WHERE id = ? AND lease_owner = ?
+        ''', [(expires, message_id, WORKER_ID) for message_id in ids])
+    return cursor.rowcount
 
-        # Optionally, delete the message from the database after sending
-        cursor.execute('DELETE FROM scheduled_messages WHERE id = ?', (message_id,))
+def send_scheduled_messages(backend=None, workers=SEND_WORKERS, rate=SEND_RATE, burst=SEND_BURST, shard=None,
+                            lease_seconds=LEASE_SECONDS):
+    # Connect to the SQLite database
+    conn = get_connection()
+    cursor = conn.cursor()
 
-    # Commit the changes and close the connection
-    conn.commit()
-    conn.close()
+    # Reuse the shared backend unless one was passed in (e.g. HttpBackend for load tests)
+    if backend is None:
+        backend = get_backend()
+    bucket = TokenBucket(rate, burst)
 
-def main():
+    # Keep claiming batches until no due message is left for this dispatcher
+    while True:
+        messages_to_send = claim_due_messages(shard=shard, limit=claim_limit(rate, lease_seconds),
+                                              lease_seconds=lease_seconds)
+        if not messages_to_send:
+            return
+
+        # Send concurrently; each worker waits for a token before every attempt
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(send_with_retry, backend, bucket, message[2], message[3]): message[0]
+                for message in messages_to_send
+            }
+            unfinished = set(futures)
+            # Keep renewing the lease on unsent messages so a slow batch is never reclaimed mid-send
+            while unfinished:
+                _, unfinished = wait(unfinished, timeout=lease_seconds / 3)
+                if unfinished:
+                    renew_lease([futures[future] for future in unfinished], lease_seconds)
+            errors = [future.result() for future in futures]
+
+        sent_ids = []
+        failed = []
+        failed_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        for message, error in zip(messages_to_send, errors):
+            if error is None:
+                sent_ids.append((message[0], WORKER_ID))
+            else:
+                print(f"Failed to send message {message[0]} to {message[2]}: {error}")
+                failed.append((error, failed_at, message[0], WORKER_ID))
+
+        # Delete sent rows and move failures aside in one transaction, but only rows this
+        # dispatcher still holds; a row reclaimed by another dispatcher is theirs to finish
+        with conn:
+            cursor.executemany('DELETE FROM scheduled_messages WHERE id = ? AND lease_owner = ?', sent_ids)
+            recorded = cursor.rowcount
+            cursor.executemany('''
+                INSERT OR REPLACE INTO failed_messages
+                (id, user_id, recipient_number, message_content, scheduled_time, timezone, error, failed_at)
+                SELECT id, user_id, recipient_number, message_content, scheduled_time, timezone, ?, ?
+                FROM scheduled_messages WHERE id = ? AND lease_owner = ?
+            ''', failed)
+            cursor.executemany('DELETE FROM scheduled_messages WHERE id = ? AND lease_owner = ?',
+                               [row[2:] for row in failed])
+            recorded += cursor.rowcount
+        print(f"Sent {len(sent_ids)} messages, {len(failed)} failed")
+        lost = len(sent_ids) + len(failed) - recorded
+        if lost:
+            print(f"Warning: {lost} messages were reclaimed by another dispatcher before they were recorded")
+
+def utc_to_epoch(utc_time):
+    # scheduled_time is stored as a naive UTC string
+    return datetime.strptime(utc_time, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc).timestamp()
+
+class DueScheduler:
+    """Sleeps until the next message is due using an in-memory min-heap of due times"""
+    def __init__(self, dispatch=None, shard=None, window=10000, resync_interval=60, check_interval=1.0):
+        # shard is (index, count) like claim_due_messages; only that share of messages is tracked
+        self.shard = shard
+        self.dispatch = dispatch or partial(send_scheduled_messages, shard=shard)
+        # Only the earliest `window` due times are kept in memory; later ones are loaded as the heap drains
+        self.window = window
+        # Re-read the DB this often as a safety net
+        self.resync_interval = resync_interval
+        # Check this often whether another process (CLI, import) scheduled an earlier message
+        self.check_interval = check_interval
+        self.data_version = None
+        self.heap = []
+        self.horizon = None
+        self.condition = threading.Condition()
+        self.running = False
+
+    def _shard_filter(self):
+        if self.shard is None:
+            return '', []
+        return ' AND shard_of(user_id, ?) = ?', [self.shard[1], self.shard[0]]
+
+    def load(self):
+        """Reload the earliest due times this dispatcher could claim from the database"""
+        shard_sql, shard_params = self._shard_filter()
+        # Rows leased by another dispatcher are included, but only become claimable once the lease runs out
+        rows = get_connection().execute(f'''
+            SELECT scheduled_time, status, lease_expires FROM scheduled_messages
+            WHERE 1 = 1{shard_sql}
+            ORDER BY scheduled_time
+            LIMIT ?
+        ''', shard_params + [self.window]).fetchall()
+        wake_times = []
+        for scheduled_time, status, lease_expires in rows:
+            wake_time = utc_to_epoch(scheduled_time)
+            if status != 'pending' and lease_expires is not None:
+                # claim_due_messages needs lease_expires < now, so wake just after it
+                wake_time = max(wake_time, lease_expires + 0.01)
+            wake_times.append(wake_time)
+        heapq.heapify(wake_times)
+        with self.condition:
+            self.heap = wake_times
+            # When the window is full, later messages are only known to be after the horizon
+            self.horizon = rows[-1][0] if len(rows) == self.window else None
+
+    def check_for_new(self):
+        """Pick up an earlier message scheduled by another process, at the cost of one PRAGMA when nothing changed"""
+        conn = get_connection()
+        # data_version only changes when another connection commits to the database
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        if version == self.data_version:
+            return
+        self.data_version = version
+        shard_sql, shard_params = self._shard_filter()
+        row = conn.execute(f'''
+            SELECT MIN(scheduled_time) FROM scheduled_messages
+            WHERE status = 'pending'{shard_sql}
+        ''', shard_params).fetchone()
+        if row[0] is None:
+            return
+        with self.condition:
+            earlier = not self.heap or utc_to_epoch(row[0]) < self.heap[0]
+        if earlier:
+            self.notify(row[0])
+
+    def notify(self, utc_time):
+        """Record a newly scheduled message and wake the loop if it is due sooner"""
+        with self.condition:
+            if self.horizon is None or utc_time <= self.horizon:
+                heapq.heappush(self.heap, utc_to_epoch(utc_time))
+                self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+    def run(self):
+        global _due_scheduler
+        _due_scheduler = self
+        self.running = True
+        self.load()
+        last_sync = time.monotonic()
+        last_check = last_sync
+        try:
+            while True:
+                if time.monotonic() - last_check >= self.check_interval:
+                    self.check_for_new()
+                    last_check = time.monotonic()
+                with self.condition:
+                    if not self.running:
+                        break
+                    now = time.time()
+                    timeout = min(self.resync_interval - (time.monotonic() - last_sync),
+                                  self.check_interval - (time.monotonic() - last_check))
+                    if self.heap:
+                        timeout = min(timeout, self.heap[0] - now)
+                    if timeout > 0:
+                        # Sleep until the next due time, a resync, or an early notify()
+                        self.condition.wait(timeout)
+                        continue
+                    due = False
+                    while self.heap and self.heap[0] <= now:
+                        heapq.heappop(self.heap)
+                        due = True
+                    drained = not self.heap and self.horizon is not None
+                if due:
+                    self.dispatch()
+                if drained or time.monotonic() - last_sync >= self.resync_interval:
+                    self.load()
+                    last_sync = time.monotonic()
+        finally:
+            _due_scheduler = None
+
+def main(use_heap=True):
     setup_database()
 
     # Get user input
@@ -102,6 +544,12 @@ def main():
     # Schedule the message
     schedule_message(user_id, recipient_number, message_content, scheduled_time, timezone_str)
 
+    if use_heap:
+        # Wake exactly when the next message is due instead of polling
+        DueScheduler().run()
+        return
+
+    import schedule
     # Schedule the send_scheduled_messages function to run every minute
     schedule.every(1).minutes.do(send_scheduled_messages)
 
@@ -111,4 +559,14 @@ def main():
         time.sleep(1)
 
 if __name__ == "__main__":
-    main()
+    # python whatsapp_automation.py import campaign.csv  -> bulk-schedule without prompts
+    # python whatsapp_automation.py dispatch [index count] -> run one of several dispatchers
+    if len(sys.argv) == 3 and sys.argv[1] == "import":
+        setup_database()
+        import_messages(sys.argv[2])
+    elif len(sys.argv) in (2, 4) and sys.argv[1] == "dispatch":
+        setup_database()
+        shard = (int(sys.argv[2]), int(sys.argv[3])) if len(sys.argv) == 4 else None
+        DueScheduler(shard=shard).run()
+    else:
+        main()
@@ -1,5 +1,49 @@
 import os
-import yt_dlp
+import re
+import sys
+import copy
+import time
+import json
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+# yt_dlp is imported inside the functions that use it so the menu starts quickly
+
+# Protocols yt-dlp downloads as fragments, several at a time when concurrent_fragment_downloads > 1
+FRAGMENTED_PROTOCOLS = ('http_dash_segments', 'm3u8', 'ism', 'f4m')
+
+# Extracted info dicts by video ID, so listing and downloading share one extraction
+INFO_TTL = 30 * 60  # Stream URLs inside the info dict are signed and expire after a few hours
+_info_cache = {}
+
+def video_id(url):
+    """
+    Get the video ID from a YouTube URL.
+    :param url: YouTube video URL
+    :return: The 11-character video ID, or the URL itself if none is found
+    """
+    match = re.search(r'(?:v=|youtu\.be/|shorts/|embed/)([\w-]{11})', url)
+    return match.group(1) if match else url
+
+def get_cached_info(url):
+    """
+    Return a fresh copy of the cached info dict for a URL, if it has not expired.
+    :param url: YouTube video URL
+    :return: The info dict, or None
+    """
+    entry = _info_cache.get(video_id(url))
+    if entry is None or entry[1] < time.time():
+        return None
+    # yt-dlp updates the dict while processing it, so hand out a copy
+    return copy.deepcopy(entry[0])
+
+def cache_info(url, info):
+    """
+    Remember an extracted info dict for INFO_TTL seconds.
+    :param url: YouTube video URL
+    :param info: Info dict returned by extract_info
+    """
+    _info_cache[video_id(url)] = (copy.deepcopy(info), time.time() + INFO_TTL)
 
 def list_formats(url):
     """
@@ -7,6 +51,7 @@ def list_formats(url):
     :param url: YouTube video URL
     :return: A dictionary of formats with their IDs
     """
+    import yt_dlp
     try:
         print("\nFetching available formats...\n")
         options = {
@@ -17,11 +62,14 @@ def list_formats(url):
         formats = {}
 
         # Use yt-dlp to extract formats
-        with yt_dlp.YoutubeDL(options) as ydl:
-            info = ydl.extract_info(url, download=False)
-            for fmt in info['formats']:
-                if fmt.get("ext") and fmt.get("format_note"):
-                    formats[fmt["format_id"]] = f"{fmt['format_note']} ({fmt['ext']})"
+        info = get_cached_info(url)
+        if info is None:
+            with yt_dlp.YoutubeDL(options) as ydl:
+                info = ydl.extract_info(url, download=False)
+            cache_info(url, info)
+        for fmt in info['formats']:
+            if fmt.get("ext") and fmt.get("format_note"):
+                formats[fmt["format_id"]] = f"{fmt['format_note']} ({fmt['ext']})"
 
         # Display formats
         print("Available formats:")
@@ -33,17 +81,199 @@ def list_formats(url):
         print(f"An error occurred while fetching formats: {e}")
         return None
 
-def download_video(url, format_id):
+def parse_rate(text):
+    """
+    Parse a rate like "500K" or "2.5M" (bytes per second).
+    :param text: Number with an optional K, M or G suffix
+    :return: Bytes per second as an int
+    """
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = text.strip().upper()
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(float(text))
+
+class DownloadMonitor:
+    """
+    Writes download progress as JSON lines and splits a bandwidth budget across running downloads.
+    Each job's record shows where its time went: extraction, downloading, or merging.
+    """
+    def __init__(self, metrics_path="downloads/metrics.jsonl", total_rate=None, job_rate=None, interval=1.0):
+        """
+        :param metrics_path: JSON lines file for progress records (None to disable)
+        :param total_rate: Bytes/sec shared by all downloads (None for no limit)
+        :param job_rate: Bytes/sec cap for any single download (None for no cap)
+        :param interval: Seconds between progress records per download
+        """
+        self.metrics_path = metrics_path
+        self.total_rate = total_rate
+        self.job_rate = job_rate
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+    def _emit(self, record):
+        if self.metrics_path is None:
+            return
+        record['ts'] = round(time.time(), 3)
+        with self.lock:
+            with open(self.metrics_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def _rebalance(self):
+        # Equal share of the budget per running download, never above the per-job cap.
+        # Single-stream (https) downloads read ratelimit from params on every block, so they follow
+        # rebalances live. Fragmented downloads copy params when they start and split nothing:
+        # each fragment thread gets the full limit, so it is divided by the thread count, and
+        # they keep the share they started with until the next file of the job.
+        limits = [rate for rate in (self.total_rate and self.total_rate // max(1, len(self.jobs)), self.job_rate) if rate]
+        rate = min(limits) if limits else None
+        for job in self.jobs.values():
+            fragments = 1
+            if job['fragmented']:
+                fragments = job['params'].get('concurrent_fragment_downloads') or 1
+            job['params']['ratelimit'] = rate // fragments if rate else None
+
+    def set_protocols(self, job_id, protocols):
+        """
+        Tell the monitor which protocols a job's chosen formats use, before it starts downloading.
+        :param job_id: Download the formats belong to
+        :param protocols: Protocol of each requested format (video and audio may differ)
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            # One params dict per job, so a job with any fragmented stream is limited as fragmented
+            job['fragmented'] = any(protocol.startswith(FRAGMENTED_PROTOCOLS) for protocol in protocols)
+            self._rebalance()
+
+    def protocol_probe(self, job_id):
+        """
+        :param job_id: Download the probe reports for
+        :return: A yt-dlp postprocessor to add with when='before_dl', which calls set_protocols
+                 after format selection and before the downloader copies the params
+        """
+        from yt_dlp.postprocessor import PostProcessor
+        monitor = self
+
+        class ProtocolProbePP(PostProcessor):
+            def run(self, info):
+                formats = info.get('requested_formats') or [info]
+                monitor.set_protocols(job_id, [f.get('protocol') or '' for f in formats])
+                return [], info
+        return ProtocolProbePP()
+
+    def start_job(self, job_id, params):
+        """
+        Register a download. params must be the YoutubeDL's own params dict so rate changes take effect.
+        :param job_id: Name for the download in the metrics (usually its URL)
+        :param params: ydl.params of the YoutubeDL doing the download
+        """
+        with self.lock:
+            self.jobs[job_id] = {
+                'params': params, 'started': time.time(), 'first_byte': None, 'downloaded': None,
+                'merge_started': None, 'merge_seconds': 0.0, 'files': {}, 'last_emit': 0.0,
+                'fragmented': False,
+            }
+            self._rebalance()
+        self._emit({'event': 'start', 'job': job_id})
+
+    def progress_hook(self, job_id):
+        """
+        :param job_id: Download the hook reports for
+        :return: A function for YoutubeDL's progress_hooks
+        """
+        def hook(d):
+            now = time.time()
+            with self.lock:
+                job = self.jobs.get(job_id)
+                if job is None:
+                    return
+                if job['first_byte'] is None:
+                    job['first_byte'] = now  # Extraction ends when the first bytes arrive
+                # Separate video and audio streams are separate files; totals add up across them
+                job['files'][d.get('filename')] = (
+                    d.get('downloaded_bytes') or 0,
+                    d.get('total_bytes') or d.get('total_bytes_estimate') or 0,
+                )
+                if d['status'] == 'finished':
+                    job['downloaded'] = now
+                elif now - job['last_emit'] < self.interval:
+                    return
+                job['last_emit'] = now
+                downloaded = sum(done for done, _ in job['files'].values())
+                total = sum(size for _, size in job['files'].values())
+            self._emit({
+                'event': 'progress', 'job': job_id, 'status': d['status'],
+                'bytes': downloaded, 'total': total, 'speed': d.get('speed'), 'eta': d.get('eta'),
+                'fragment': d.get('fragment_index'), 'fragments': d.get('fragment_count'),
+                'ratelimit': job['params'].get('ratelimit'),
+            })
+        return hook
+
+    def postprocessor_hook(self, job_id):
+        """
+        :param job_id: Download the hook reports for
+        :return: A function for YoutubeDL's postprocessor_hooks, timing merges and conversions
+        """
+        def hook(d):
+            if d.get('postprocessor') == 'ProtocolProbe':
+                return  # Our own probe, not a merge
+            with self.lock:
+                job = self.jobs.get(job_id)
+                if job is None:
+                    return
+                if d['status'] == 'started':
+                    job['merge_started'] = time.time()
+                elif d['status'] == 'finished' and job['merge_started'] is not None:
+                    job['merge_seconds'] += time.time() - job['merge_started']
+                    job['merge_started'] = None
+        return hook
+
+    def finish_job(self, job_id, ok):
+        """
+        Unregister a download and record where its time went.
+        :param job_id: Download that ended
+        :param ok: Whether it succeeded
+        :return: The summary record
+        """
+        now = time.time()
+        with self.lock:
+            job = self.jobs.pop(job_id)
+            self._rebalance()
+        first_byte = job['first_byte'] or now
+        downloaded_at = job['downloaded'] or now
+        total_bytes = sum(done for done, _ in job['files'].values())
+        download_seconds = max(0.0, downloaded_at - first_byte)
+        record = {
+            'event': 'finish', 'job': job_id, 'ok': ok, 'bytes': total_bytes,
+            'seconds': round(now - job['started'], 3),
+            'extract_seconds': round(first_byte - job['started'], 3),
+            'download_seconds': round(download_seconds, 3),
+            'merge_seconds': round(job['merge_seconds'], 3),
+            'avg_bytes_per_sec': round(total_bytes / download_seconds) if download_seconds else None,
+        }
+        self._emit(record)
+        return record
+
+def download_video(url, format_id, monitor=None):
     """
     Downloads a YouTube video in the user-selected format.
     :param url: YouTube video URL
     :param format_id: Format ID for the desired resolution/format
+    :param monitor: DownloadMonitor for metrics and bandwidth limits (a default one if None)
     """
+    import yt_dlp
+    monitor = monitor or DownloadMonitor()
+    ok = False
     try:
         # Specify download options
         options = {
             'format': format_id,  # User-selected format
             'outtmpl': 'downloads/%(title)s.%(ext)s',  # Save to 'downloads' folder
+            'progress_hooks': [monitor.progress_hook(url)],
+            'postprocessor_hooks': [monitor.postprocessor_hook(url)],
         }
 
         # Ensure the 'downloads' directory exists
@@ -52,18 +282,164 @@ def download_video(url, format_id):
 
         print("\nDownloading...")
         with yt_dlp.YoutubeDL(options) as ydl:
-            ydl.download([url])
+            monitor.start_job(url, ydl.params)
+            ydl.add_post_processor(monitor.protocol_probe(url), when='before_dl')
+            info = get_cached_info(url)
+            if info is not None:
+                # Reuse the listing step's extraction instead of fetching the page again
+                ydl.process_ie_result(info, download=True)
+            else:
+                info = ydl.extract_info(url, download=True)
+                cache_info(url, info)
 
+        ok = True
         print("Download complete! Check the 'downloads' folder.")
     except Exception as e:
         print(f"An error occurred: {e}")
+    finally:
+        if url in monitor.jobs:
+            monitor.finish_job(url, ok)
+
+# Format policies for batch mode, used instead of asking for a format ID per video
+FORMAT_POLICIES = {
+    'best': 'bv*+ba/b',
+    '1080p-mp4': 'bv*[height<=1080][ext=mp4]+ba[ext=m4a]/b[height<=1080][ext=mp4]/bv*[height<=1080]+ba/b[height<=1080]',
+    '720p-mp4': 'bv*[height<=720][ext=mp4]+ba[ext=m4a]/b[height<=720][ext=mp4]/bv*[height<=720]+ba/b[height<=720]',
+    'audio': 'bestaudio/best',
+}
+
+def expand_sources(sources):
+    """
+    Turn URLs, playlist URLs and list files into a flat list of video entries.
+    :param sources: URLs, playlist URLs or paths to files with one URL per line
+    :return: A list of (archive key, URL) tuples
+    """
+    import yt_dlp
+    urls = []
+    for source in sources:
+        if os.path.isfile(source):
+            with open(source, "r") as f:
+                urls.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+        else:
+            urls.append(source)
+
+    entries = []
+    # Flat extraction only lists playlist entries; each video is extracted by its own job later
+    with yt_dlp.YoutubeDL({'quiet': True, 'extract_flat': 'in_playlist'}) as ydl:
+        for url in urls:
+            vid = video_id(url)
+            if vid != url and 'list=' not in url:
+                # A single YouTube video needs no listing; its job does the only extraction
+                entries.append((f"youtube {vid}".lower(), url))
+                continue
+            try:
+                info = ydl.extract_info(url, download=False, process=False)
+            except Exception as e:
+                print(f"Skipping {url}: {e}")
+                continue
+            for entry in info.get('entries') or [info]:
+                if entry is None:
+                    continue
+                key = f"{entry.get('ie_key') or info.get('extractor_key') or 'youtube'} {entry.get('id')}".lower()
+                entries.append((key, entry.get('webpage_url') or entry.get('url') or url))
+    return entries
+
+def read_archive(archive_path):
+    """
+    Read the download archive yt-dlp writes after each finished video.
+    :param archive_path: Path of the archive file
+    :return: A set of "extractor id" keys
+    """
+    if not os.path.exists(archive_path):
+        return set()
+    with open(archive_path, "r") as f:
+        return {line.strip().lower() for line in f if line.strip()}
+
+def batch_download(sources, policy="1080p-mp4", jobs=3, fragments=4, archive_path="downloads/archive.txt",
+                   monitor=None):
+    """
+    Download many videos concurrently without prompting, skipping ones already done.
+    :param sources: URLs, playlist URLs or list files
+    :param policy: A FORMAT_POLICIES name or a raw yt-dlp format string
+    :param jobs: Videos downloaded at the same time
+    :param fragments: Fragments fetched at the same time inside each video (above 1, YouTube formats are requested as DASH)
+    :param archive_path: File recording finished videos, so reruns skip them
+    :param monitor: DownloadMonitor for metrics and bandwidth limits (a default one if None)
+    :return: (downloaded, skipped, failed) counts
+    """
+    import yt_dlp
+    if not os.path.exists("downloads"):
+        os.makedirs("downloads")
+    monitor = monitor or DownloadMonitor()
+
+    entries = expand_sources(sources)
+    done = read_archive(archive_path)
+    todo = []
+    queued = set()
+    for key, url in entries:
+        # The same video can appear in several playlists or twice in a list file
+        if key not in done and key not in queued:
+            queued.add(key)
+            todo.append((key, url))
+    skipped = sum(1 for key in {key for key, _ in entries} if key in done)
+    duplicates = len(entries) - len(todo) - skipped
+    print(f"\n{len(entries)} videos found, {skipped} already downloaded, {duplicates} duplicates, {len(todo)} to go.")
+
+    options = {
+        'format': FORMAT_POLICIES.get(policy, policy),
+        'outtmpl': 'downloads/%(title)s [%(id)s].%(ext)s',  # ID in the name keeps same-titled videos apart
+        'download_archive': archive_path,  # yt-dlp records each finished video here
+        'concurrent_fragment_downloads': fragments,
+        'continuedl': True,  # Resume .part files left by an interrupted run
+        'retries': 10,
+        'fragment_retries': 10,
+        'quiet': True,
+        'noprogress': True,
+    }
+    if fragments > 1:
+        # YouTube's default formats are single https streams with nothing to fetch in parallel;
+        # "dashy" serves the same formats as DASH fragments so several can be fetched at once
+        options['extractor_args'] = {'youtube': {'formats': ['dashy']}}
+
+    def download_one(item):
+        # The archive key is unique within the batch, so it doubles as the job id
+        key, url = item
+        job_options = dict(options, progress_hooks=[monitor.progress_hook(key)],
+                           postprocessor_hooks=[monitor.postprocessor_hook(key)])
+        ok = False
+        record = None
+        try:
+            # One YoutubeDL per job; instances are not safe to share between threads
+            with yt_dlp.YoutubeDL(job_options) as ydl:
+                monitor.start_job(key, ydl.params)
+                ydl.add_post_processor(monitor.protocol_probe(key), when='before_dl')
+                ydl.download([url])
+            ok = True
+        except Exception as e:
+            print(f"Failed {url}: {e}")
+        finally:
+            if key in monitor.jobs:
+                record = monitor.finish_job(key, ok)
+        if ok and record is not None:
+            print(f"Downloaded {url}: {record['bytes'] / (1024 * 1024):.1f} MB in {record['seconds']}s "
+                  f"(extract {record['extract_seconds']}s, download {record['download_seconds']}s, "
+                  f"merge {record['merge_seconds']}s)")
+        return ok
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(download_one, todo))
+    downloaded = sum(results)
+    failed = len(results) - downloaded
+    print(f"\nBatch complete: {downloaded} downloaded, {skipped} skipped, {failed} failed.")
+    return downloaded, skipped, failed
 
 def main():
     print("Welcome to the YouTube Video Downloader with Resolution Selection!")
     while True:
         print("\nOptions:")
         print("1. Download a video/audio")
-        print("2. Exit")
+        print("2. Batch download (playlist URL or list file)")
+        print("3. Exit")
 
         choice = input("\nEnter your choice: ").strip()
         if choice == "1":
@@ -82,10 +458,34 @@ def main():
                         # Step 3: Download video in selected format
                         download_video(url, format_id)
         elif choice == "2":
+            source = input("\nEnter a playlist URL or the path of a file with one URL per line: ").strip()
+            if not source:
+                print("Error: Source cannot be empty.")
+            else:
+                print(f"Format policies: {', '.join(FORMAT_POLICIES)} (or any yt-dlp format string)")
+                policy = input("Enter the format policy (default is 1080p-mp4): ").strip() or "1080p-mp4"
+                batch_download([source], policy)
+        elif choice == "3":
             print("Goodbye!")
             break
         else:
-            print("Invalid choice. Please enter 1 or 2.")
+            print("Invalid choice. Please enter 1, 2 or 3.")
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        # Non-interactive batch mode, e.g. python youtube_video_downloader.py list.txt --jobs 4
+        parser = argparse.ArgumentParser(description="Batch download YouTube videos and playlists")
+        parser.add_argument("sources", nargs="+", help="video URLs, playlist URLs or files with one URL per line")
+        parser.add_argument("--format", default="1080p-mp4", help=f"one of {', '.join(FORMAT_POLICIES)} or a yt-dlp format string")
+        parser.add_argument("--jobs", type=int, default=3, help="videos downloaded at the same time")
+        parser.add_argument("--fragments", type=int, default=4,
+                            help="fragments fetched at the same time per video (1 keeps YouTube's single-stream formats)")
+        parser.add_argument("--archive", default="downloads/archive.txt", help="file recording finished downloads")
+        parser.add_argument("--bandwidth", type=parse_rate, help="total rate shared by all downloads, e.g. 5M")
+        parser.add_argument("--job-rate", type=parse_rate, help="rate cap for each download, e.g. 1M")
+        parser.add_argument("--metrics", default="downloads/metrics.jsonl", help="JSON lines file for progress metrics")
+        args = parser.parse_args()
+        monitor = DownloadMonitor(args.metrics, args.bandwidth, args.job_rate)
+        batch_download(args.sources, args.format, args.jobs, args.fragments, args.archive, monitor)
+    else:
+        main()